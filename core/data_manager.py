@@ -12,13 +12,23 @@ JSONファイルとしてアイテムデータを保存・管理します。
     - アイテムの履歴追加、タグ更新
 """
 
+import copy
+import functools
 import json
 import os
+import stat
+import tempfile
+import threading
 import uuid
 import datetime
 import unittest
 from core.config_manager import PROJECTS_BASE_DIR
 
+try:
+    import orjson # 高速なJSONライブラリ。インストールされていればアイテムデータの読み書きに使う
+except ImportError:
+    orjson = None
+
 # --- 定数 ---
 GAMEDATA_SUBDIR_NAME = "gamedata"
 """str: プロジェクトディレクトリ内のゲームデータ保存用サブディレクトリ名。"""
@@ -26,6 +36,99 @@ GAMEDATA_SUBDIR_NAME = "gamedata"
 IMAGES_SUBDIR_NAME = "images"
 """str: プロジェクトディレクトリ内の画像ファイル保存用サブディレクトリ名。"""
 
+HISTORY_LOG_SUBDIR_NAME = "history_logs"
+"""str: gamedata ディレクトリ内の、アイテム履歴の追記ログ (JSONL) 保存用サブディレクトリ名。"""
+
+ITEM_CACHE_SIZE = 128
+"""int: get_item の読み込み結果を、ファイルの状態ごとにキャッシュしておくアイテム数の上限。"""
+
+HISTORY_LOG_COMPACT_THRESHOLD = 200
+"""int: 追記ログの行数がこれを超えたアイテムは、ログへの追記時に履歴を本体へ書き戻してログを削除する。"""
+
+_PROCESS_UMASK = os.umask(0) # umask は設定しないと取得できないため、読み込み時に一度だけ取得してすぐに戻す
+os.umask(_PROCESS_UMASK)
+_NEW_FILE_MODE = 0o666 & ~_PROCESS_UMASK # 新しく作成するファイルのパーミッション (open で作成した場合と同じ)
+
+_DATA_WRITE_LOCK = threading.RLock()
+"""threading.RLock: カテゴリファイルと追記ログへの書き込み (読み込み→変更→書き込み を含む) を直列化するロック。
+
+保存ワーカースレッドとGUIスレッドから同じファイルに同時に書き込んでも、
+一方の変更がもう一方の書き込みで失われないようにします。
+update_item から save_data_category を呼ぶなど入れ子で取得するため、再入可能なロックを使います。
+"""
+
+# --- JSON読み書きヘルパー関数 ---
+
+def _target_file_mode(filepath: str) -> int:
+    """ファイルを置き換えるときに設定するパーミッションを返します。
+
+    Args:
+        filepath (str): 置き換える (または新しく作成する) ファイルのパス。
+
+    Returns:
+        int: 既存のファイルであればそのパーミッション、なければ 0o666 から umask を除いた値。
+    """
+    try:
+        return stat.S_IMODE(os.stat(filepath).st_mode)
+    except OSError:
+        return _NEW_FILE_MODE
+
+def _read_json_file(filepath: str):
+    """JSONファイルを読み込んで返します。orjson があればそちらで解析します。
+
+    Args:
+        filepath (str): 読み込むファイルのパス。
+
+    Returns:
+        Any: 解析されたJSONデータ。
+
+    Raises:
+        json.JSONDecodeError: JSONの形式が不正な場合 (orjson.JSONDecodeError もこのサブクラス)。
+    """
+    if orjson is not None:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_json_file(filepath: str, data, pretty: bool = False) -> None:
+    """データをJSONとしてファイルに書き込みます。orjson があればそちらで変換します。
+
+    作業用のデータファイルは、書き込むバイト数と変換の手間を減らすため空白なしの形式で書き込みます。
+    JSON全体をメモリ上で作ってから一時ファイルに1回の write で書き込み、
+    os.replace で置き換えます。書き込み中にアプリが終了しても元のファイルは壊れません。
+    一時ファイルは書き込みごとに一意の名前で作成するため、同時に書き込まれても互いの一時ファイルを壊しません。
+    置き換え後のファイルは、元のファイルのパーミッション (新規作成時は umask に従った既定値) を引き継ぎます。
+
+    Args:
+        filepath (str): 書き込み先のファイルのパス。
+        data (Any): 書き込むデータ。
+        pretty (bool, optional): True の場合、人が読みやすいようにインデント付きで書き込む。デフォルトは False。
+    """
+    if orjson is not None:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    elif pretty:
+        content = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    else:
+        content = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath) or None,
+                                    prefix=os.path.basename(filepath) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.chmod(tmp_path, _target_file_mode(filepath)) # mkstemp は 0600 で作成するため
+        os.replace(tmp_path, filepath)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _dumps_json_line(record: dict) -> bytes:
+    """記録を改行付きの1行のJSON (UTF-8) に変換します。追記ログ (JSONL) の書き込み用。"""
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
 # --- パス取得ヘルパー関数 ---
 
 def get_project_gamedata_path(project_dir_name: str) -> str:
@@ -63,6 +166,22 @@ def get_category_filepath(project_dir_name: str, category_name: str) -> str:
     filename = f"{category_name}.json"
     return os.path.join(gamedata_dir, filename)
 
+def get_history_log_filepath(project_dir_name: str, category_name: str, item_id: str) -> str:
+    """指定されたアイテムの履歴追記ログ (JSONL) ファイルのフルパスを返します。
+
+    追記ログは gamedata/history_logs/<カテゴリ名>/<アイテムID>.jsonl に保存されます。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_id (str): 対象アイテムのID。
+
+    Returns:
+        str: 履歴追記ログファイルのフルパス。
+    """
+    gamedata_dir = get_project_gamedata_path(project_dir_name)
+    return os.path.join(gamedata_dir, HISTORY_LOG_SUBDIR_NAME, category_name, f"{item_id}.jsonl")
+
 # プロジェクト画像ディレクトリ関連ヘルパー
 def get_project_images_path(project_dir_name: str) -> str:
     """指定されたプロジェクトの画像保存用サブディレクトリ (images/) のフルパスを返します。
@@ -159,14 +278,15 @@ def create_category(project_dir_name: str, category_name: str) -> bool:
             os.makedirs(gamedata_dir, exist_ok=True)
             # print(f"Created gamedata directory for project '{project_dir_name}': {gamedata_dir}")
 
-        if not os.path.exists(filepath):
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump({}, f) # 空のJSONオブジェクトで初期化
-            # print(f"Category '{category_name}' created for project '{project_dir_name}' at {filepath}")
-            return True
-        else:
-            print(f"Info: Category '{category_name}' already exists for project '{project_dir_name}'. No action taken.")
-            return False # 既に存在する場合は False (エラーではないが、新規作成はしていない)
+        with _DATA_WRITE_LOCK: # 存在確認と作成の間に他の書き込みが入らないようにする
+            if not os.path.exists(filepath):
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    json.dump({}, f) # 空のJSONオブジェクトで初期化
+                # print(f"Category '{category_name}' created for project '{project_dir_name}' at {filepath}")
+                return True
+            else:
+                print(f"Info: Category '{category_name}' already exists for project '{project_dir_name}'. No action taken.")
+                return False # 既に存在する場合は False (エラーではないが、新規作成はしていない)
     except Exception as e:
         print(f"Error creating category '{category_name}' for project '{project_dir_name}': {e}")
         return False
@@ -204,8 +324,7 @@ def load_data_category(project_dir_name: str, category_name: str) -> dict | None
             return None
 
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _read_json_file(filepath)
         if not isinstance(data, dict): # ルートが辞書でない場合は不正な形式とみなす
             print(f"Warning: Data in '{filepath}' is not a valid dictionary. Returning empty data.")
             return {}
@@ -241,15 +360,15 @@ def save_data_category(project_dir_name: str, category_name: str, data: dict) ->
 
     filepath = get_category_filepath(project_dir_name, category_name)
     gamedata_dir = os.path.dirname(filepath)
-    try:
-        os.makedirs(gamedata_dir, exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        # print(f"Data for category '{category_name}' saved to '{filepath}' in project '{project_dir_name}'.")
-        return True
-    except Exception as e:
-        print(f"Error saving data for category '{category_name}' in project '{project_dir_name}': {e}")
-        return False
+    with _DATA_WRITE_LOCK: # 同じカテゴリファイルへの書き込みを直列化する
+        try:
+            os.makedirs(gamedata_dir, exist_ok=True)
+            _write_json_file(filepath, data)
+            # print(f"Data for category '{category_name}' saved to '{filepath}' in project '{project_dir_name}'.")
+            return True
+        except Exception as e:
+            print(f"Error saving data for category '{category_name}' in project '{project_dir_name}': {e}")
+            return False
 
 # --- アイテム操作 ---
 
@@ -294,10 +413,69 @@ def get_item(project_dir_name: str, category_name: str, item_id: str) -> dict |
         dict | None: アイテムの詳細データの辞書。アイテムが存在しない場合や
                      カテゴリデータの読み込みに失敗した場合は None。
     """
-    data = load_data_category(project_dir_name, category_name)
-    if data is None:
+    data_signature = _file_signature(get_category_filepath(project_dir_name, category_name))
+    if data_signature is None:
+        # カテゴリファイルがない (load_data_category がカテゴリを作成する) 場合はキャッシュしない
+        data = load_data_category(project_dir_name, category_name)
+        return data.get(item_id) if data is not None else None
+
+    log_signature = _file_signature(get_history_log_filepath(project_dir_name, category_name, item_id))
+    try:
+        item, _log_line_count = _load_item_snapshot(project_dir_name, category_name, item_id, data_signature, log_signature)
+    except Exception as e:
+        # 読み込みの失敗はキャッシュされないため、次回の呼び出しで読み直す
+        print(f"Error loading item '{item_id}' from category '{category_name}', project '{project_dir_name}': {e}")
         return None
-    return data.get(item_id) # 指定IDのアイテムを返す (なければNone)
+    return copy.deepcopy(item) # 呼び出し側が変更してもキャッシュに影響しないようにする
+
+def _file_signature(filepath: str) -> tuple | None:
+    """ファイルが変更されたかどうかの判定に使う (更新時刻, サイズ, inode) の組を返します。
+
+    Args:
+        filepath (str): 対象ファイルのパス。
+
+    Returns:
+        tuple | None: ファイルの状態を表すタプル。ファイルが存在しなければ None。
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+@functools.lru_cache(maxsize=ITEM_CACHE_SIZE)
+def _load_item_snapshot(project_dir_name: str, category_name: str, item_id: str,
+                        data_signature: tuple, log_signature: tuple | None) -> tuple | None:
+    """カテゴリファイルと追記ログからアイテムを読み込みます。get_item のキャッシュ本体です。
+
+    data_signature と log_signature はキャッシュのキーとしてのみ使われ、
+    どちらかのファイルが書き換えられると別のキーになるため、古い結果は使われません。
+    返したアイテム辞書はキャッシュとして共有されるため、呼び出し側で変更しないでください。
+    読み込みに失敗した場合は例外を送出します。lru_cache は例外をキャッシュしないため、
+    一時的な読み込みエラー (他のプロセスが書き込み中など) の結果が使われ続けることはありません。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_id (str): 取得するアイテムのID。
+        data_signature (tuple): カテゴリファイルの _file_signature。
+        log_signature (tuple | None): 追記ログの _file_signature (ログがなければ None)。
+
+    Returns:
+        tuple: (アイテム辞書 (なければ None), 追記ログの記録数)。
+
+    Raises:
+        OSError: カテゴリファイルを読み込めなかった場合。
+        ValueError: カテゴリファイルの内容が不正な場合 (json.JSONDecodeError を含む)。
+    """
+    data = _read_json_file(get_category_filepath(project_dir_name, category_name))
+    if not isinstance(data, dict): # ルートが辞書でない場合は不正な形式とみなす
+        raise ValueError(f"Data in category '{category_name}' is not a valid dictionary.")
+    item = data.get(item_id) # 指定IDのアイテム (なければNone)
+    log_line_count = 0
+    if isinstance(item, dict):
+        log_line_count = _merge_history_log(project_dir_name, category_name, item_id, item)
+    return item, log_line_count
 
 def add_item(project_dir_name: str, category_name: str, item_data: dict) -> str | None:
     """指定されたプロジェクトとカテゴリに新しいアイテムを追加します。
@@ -345,29 +523,31 @@ def add_item(project_dir_name: str, category_name: str, item_data: dict) -> str
 
     # --- ★★★ ファイルへの保存処理 ★★★ ---
     # (ここから先は変更ありません。ただし、ファイル操作のエラーハンドリングは重要)
-    category_data = load_data_category(project_dir_name, category_name)
-    if category_data is None:
-        print(f"Error: Could not load category data for '{category_name}' in project '{project_dir_name}'.")
-        return None
+    with _DATA_WRITE_LOCK: # 読み込みから保存までの間に他の書き込みが入らないようにする
+        category_data = load_data_category(project_dir_name, category_name)
+        if category_data is None:
+            print(f"Error: Could not load category data for '{category_name}' in project '{project_dir_name}'.")
+            return None
 
-    if new_id in category_data:
-        print(f"Error: Item with ID '{new_id}' already exists in category '{category_name}'.")
-        return None
+        if new_id in category_data:
+            print(f"Error: Item with ID '{new_id}' already exists in category '{category_name}'.")
+            return None
 
-    category_data[new_id] = item_to_save # 新しいアイテムを辞書に追加
+        category_data[new_id] = item_to_save # 新しいアイテムを辞書に追加
 
-    if save_data_category(project_dir_name, category_name, category_data):
-        # print(f"Added new item with ID '{new_id}' to category '{category_name}'.")
-        return new_id
-    else:
-        print(f"Error: Could not save category data after adding item '{new_id}'.")
-        return None
+        if save_data_category(project_dir_name, category_name, category_data):
+            # print(f"Added new item with ID '{new_id}' to category '{category_name}'.")
+            return new_id
+        else:
+            print(f"Error: Could not save category data after adding item '{new_id}'.")
+            return None
 
 def update_item(project_dir_name: str, category_name: str, item_id: str, update_data: dict) -> bool:
     """指定されたプロジェクト、カテゴリ、IDのアイテムデータを更新します。
 
     `update_data` に含まれるキーと値で、既存のアイテムデータを上書きします。
     アイテムIDとカテゴリ名は変更されません。
+    変更のあるキーだけを書き換え、どの値も既存と同じであればファイルへの書き込みを省略します。
 
     Args:
         project_dir_name (str): 対象プロジェクトのディレクトリ名。
@@ -383,30 +563,70 @@ def update_item(project_dir_name: str, category_name: str, item_id: str, update_
         print("Error: Project name, category name, and item ID are required for update.")
         return False
 
-    data = load_data_category(project_dir_name, category_name)
-    if data is None or item_id not in data:
-        print(f"Error: Item with ID '{item_id}' not found in category '{category_name}', project '{project_dir_name}', or category data load failed.")
-        return False
+    with _DATA_WRITE_LOCK: # 読み込みから保存までの間に他の書き込みが入らないようにする
+        data = load_data_category(project_dir_name, category_name)
+        if data is None or item_id not in data:
+            print(f"Error: Item with ID '{item_id}' not found in category '{category_name}', project '{project_dir_name}', or category data load failed.")
+            return False
+
+        # update_data の内容で既存データを更新
+        # data[item_id].update(update_data) # これは浅いコピーなのでネスト辞書に注意
+        changed = False
+        for key, value in update_data.items():
+            if key not in ['id', 'category']: # idとcategoryは上書きさせない
+                if key not in data[item_id] or data[item_id][key] != value:
+                    data[item_id][key] = value
+                    changed = True
+            elif key == 'id' and value != item_id:
+                print(f"Warning: Attempt to change item ID from '{item_id}' to '{value}' was ignored.")
+            elif key == 'category' and value != category_name:
+                print(f"Warning: Attempt to change item category from '{category_name}' to '{value}' was ignored.")
+
+        # 念のため、IDとカテゴリが変更されていないことを保証
+        if data[item_id].get('id') != item_id or data[item_id].get('category') != category_name:
+            data[item_id]['id'] = item_id
+            data[item_id]['category'] = category_name
+            changed = True
+
+        if not changed:
+            # ファイルの内容は既に update_data と同じなので、カテゴリ全体を書き直さない
+            if 'history' in update_data:
+                clear_history_log(project_dir_name, category_name, item_id) # 本体の履歴が最新なので追記ログは不要
+            return True
+
+        if save_data_category(project_dir_name, category_name, data):
+            # print(f"Item '{data[item_id].get('name', item_id)}' updated in category '{category_name}', project '{project_dir_name}'.")
+            if 'history' in update_data:
+                # 履歴全体が本体に書き込まれたので、追記ログは不要になる (コンパクション)
+                clear_history_log(project_dir_name, category_name, item_id)
+            return True
+        else:
+            print(f"Failed to save data after updating item '{data[item_id].get('name', item_id)}'.")
+            return False
 
-    # update_data の内容で既存データを更新
-    # data[item_id].update(update_data) # これは浅いコピーなのでネスト辞書に注意
-    for key, value in update_data.items():
-        if key not in ['id', 'category']: # idとcategoryは上書きさせない
-            data[item_id][key] = value
-        elif key == 'id' and value != item_id:
-            print(f"Warning: Attempt to change item ID from '{item_id}' to '{value}' was ignored.")
-        elif key == 'category' and value != category_name:
-            print(f"Warning: Attempt to change item category from '{category_name}' to '{value}' was ignored.")
-
-    # 念のため、IDとカテゴリが変更されていないことを保証
-    data[item_id]['id'] = item_id
-    data[item_id]['category'] = category_name
-
-    if save_data_category(project_dir_name, category_name, data):
-        # print(f"Item '{data[item_id].get('name', item_id)}' updated in category '{category_name}', project '{project_dir_name}'.")
+def export_item_pretty(project_dir_name: str, category_name: str, item_id: str, export_filepath: str) -> bool:
+    """アイテムのデータを、人が読みやすいインデント付きのJSONファイルとして書き出します。
+
+    作業用のカテゴリファイルは空白なしの形式で保存されるため、内容を確認・共有したい場合に使います。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_id (str): 書き出すアイテムのID。
+        export_filepath (str): 書き出し先のファイルのパス。
+
+    Returns:
+        bool: 書き出しが成功した場合は True、アイテムが見つからない場合や書き込みに失敗した場合は False。
+    """
+    item = get_item(project_dir_name, category_name, item_id)
+    if not item:
+        print(f"Cannot export: Item ID '{item_id}' not found in category '{category_name}', project '{project_dir_name}'.")
+        return False
+    try:
+        _write_json_file(export_filepath, item, pretty=True)
         return True
-    else:
-        print(f"Failed to save data after updating item '{data[item_id].get('name', item_id)}'.")
+    except Exception as e:
+        print(f"Error exporting item '{item_id}' to '{export_filepath}': {e}")
         return False
 
 def delete_item(project_dir_name: str, category_name: str, item_id: str) -> bool:
@@ -424,24 +644,76 @@ def delete_item(project_dir_name: str, category_name: str, item_id: str) -> bool
         print("Error: Project name, category name, and item ID are required for deletion.")
         return False
 
-    data = load_data_category(project_dir_name, category_name)
-    if data is None or item_id not in data:
-        print(f"Error: Item with ID '{item_id}' not found in category '{category_name}', project '{project_dir_name}', for deletion or category data load failed.")
-        return False # アイテムが存在しないか、カテゴリデータ読み込み失敗
+    with _DATA_WRITE_LOCK: # 読み込みから保存までの間に他の書き込みが入らないようにする
+        data = load_data_category(project_dir_name, category_name)
+        if data is None or item_id not in data:
+            print(f"Error: Item with ID '{item_id}' not found in category '{category_name}', project '{project_dir_name}', for deletion or category data load failed.")
+            return False # アイテムが存在しないか、カテゴリデータ読み込み失敗
 
-    item_name_for_log = data[item_id].get('name', item_id) # ログ用の名前取得
-    del data[item_id] # アイテムを辞書から削除
+        item_name_for_log = data[item_id].get('name', item_id) # ログ用の名前取得
+        del data[item_id] # アイテムを辞書から削除
 
-    if save_data_category(project_dir_name, category_name, data):
-        # print(f"Item '{item_name_for_log}' (ID: {item_id}) deleted from category '{category_name}', project '{project_dir_name}'.")
-        return True
-    else:
-        # 削除自体は成功したが保存に失敗した場合、データはメモリ上では削除されている
-        print(f"Failed to save data after deleting item '{item_name_for_log}'. Data integrity might be compromised.")
-        return False
+        if save_data_category(project_dir_name, category_name, data):
+            # print(f"Item '{item_name_for_log}' (ID: {item_id}) deleted from category '{category_name}', project '{project_dir_name}'.")
+            clear_history_log(project_dir_name, category_name, item_id)
+            return True
+        else:
+            # 削除自体は成功したが保存に失敗した場合、データはメモリ上では削除されている
+            print(f"Failed to save data after deleting item '{item_name_for_log}'. Data integrity might be compromised.")
+            return False
+
+def delete_items(project_dir_name: str, category_name: str, item_ids) -> int | None:
+    """指定されたカテゴリの複数のアイテムを、カテゴリファイルへの1回の書き込みで削除します。
+
+    削除したアイテムの履歴追記ログも削除します。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_ids (Iterable[str]): 削除するアイテムのIDの集まり。
+
+    Returns:
+        int | None: 実際に削除したアイテムの数 (データ内に見つからなかったIDは数えない)。
+                    カテゴリデータの読み込みまたは保存に失敗した場合は None。
+    """
+    if not project_dir_name or not category_name:
+        print("Error: Project name and category name are required for deletion.")
+        return None
+
+    with _DATA_WRITE_LOCK: # 読み込みから保存までの間に他の書き込みが入らないようにする
+        data = load_data_category(project_dir_name, category_name)
+        if data is None:
+            print(f"Error: Could not load category data for '{category_name}' in project '{project_dir_name}' for deletion.")
+            return None
+
+        deleted_ids = [item_id for item_id in item_ids if item_id in data]
+        if not deleted_ids:
+            return 0
+        for item_id in deleted_ids:
+            del data[item_id]
+
+        if not save_data_category(project_dir_name, category_name, data):
+            print(f"Failed to save data after deleting {len(deleted_ids)} items from category '{category_name}'. Data integrity might be compromised.")
+            return None
+        for item_id in deleted_ids:
+            clear_history_log(project_dir_name, category_name, item_id)
+        return len(deleted_ids)
 
 # --- 履歴とタグのヘルパー関数 ---
 
+def create_history_entry(entry_text: str) -> dict:
+    """新しい履歴エントリ（IDとタイムスタンプ付き）の辞書を作成します。ファイルへの保存は行いません。
+
+    Args:
+        entry_text (str): 履歴の内容。前後の空白は除去されます。
+
+    Returns:
+        dict: {"id": ..., "timestamp": ..., "entry": ...} 形式の履歴エントリ。
+    """
+    history_id = str(uuid.uuid4()) # 各履歴エントリに一意のIDを付与
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return {"id": history_id, "timestamp": timestamp, "entry": entry_text.strip()} # strip()で前後の空白除去
+
 def add_history_entry(project_dir_name: str, category_name: str, item_id: str, entry_text: str) -> bool:
     """指定されたアイテムに新しい履歴エントリ（IDとタイムスタンプ付き）を追加します。
 
@@ -462,17 +734,246 @@ def add_history_entry(project_dir_name: str, category_name: str, item_id: str, e
         print("Error: History entry text must be a string.")
         return False
 
-    history_id = str(uuid.uuid4()) # 各履歴エントリに一意のIDを付与
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    new_entry = {"id": history_id, "timestamp": timestamp, "entry": entry_text.strip()} # strip()で前後の空白除去
+    new_entry = create_history_entry(entry_text)
+
+    # アイテム全体を書き直さず、追記ログに1行追加するだけで保存する
+    return append_history_log_entry(project_dir_name, category_name, item_id, new_entry)
+
+def append_history_log_entry(project_dir_name: str, category_name: str, item_id: str, entry: dict) -> bool:
+    """履歴エントリをアイテムの追記ログ (JSONL) の末尾に1行で書き込みます。
+
+    カテゴリのJSONファイル全体を書き直さないため、履歴の件数に関わらず追記のコストは一定です。
+    ログの内容は get_item で読み込む際に本体の履歴の後ろに連結されます。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_id (str): 履歴を追加するアイテムのID。
+        entry (dict): 追加する履歴エントリ (create_history_entry で作成したもの)。
+
+    Returns:
+        bool: 書き込みが成功した場合は True、失敗した場合は False。
+    """
+    return _append_history_log_lines(project_dir_name, category_name, item_id, [entry])
 
-    if 'history' not in item or not isinstance(item['history'], list):
-        item['history'] = [] # 履歴フィールドがなければリストで初期化
-    item['history'].append(new_entry)
+def append_history_delta(project_dir_name: str, category_name: str, item_id: str, delta: dict) -> bool:
+    """既存の履歴エントリの編集・削除を、操作 (delta) としてアイテムの追記ログに1行で書き込みます。
 
-    # アイテム全体を更新する形で履歴を保存
-    # update_item は item_data の 'history' フィールド全体を上書きする
-    return update_item(project_dir_name, category_name, item_id, {"history": item['history']})
+    履歴全体を書き直さないため、履歴の件数に関わらず編集・削除のコストは一定です。
+    操作は get_item で読み込む際に、ログ内の順序どおりに履歴へ適用されます。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_id (str): 対象アイテムのID。
+        delta (dict): 操作の内容。以下のいずれかの形式。
+            - {"op": "replace", "id": 履歴ID, "index": 位置, "entry": 新しい内容}
+            - {"op": "delete", "id": 履歴ID, "index": 位置}
+            対象は "id" で照合し、IDを持たないエントリの場合のみ "index" (0始まり) を使います。
+
+    Returns:
+        bool: 書き込みが成功した場合は True、失敗した場合は False。
+    """
+    return append_history_deltas(project_dir_name, category_name, item_id, [delta])
+
+def append_history_deltas(project_dir_name: str, category_name: str, item_id: str, deltas: list[dict]) -> bool:
+    """複数の履歴の操作 (delta) を、順序どおりにアイテムの追記ログへ1回の write でまとめて書き込みます。
+
+    短時間に続けて行われた編集・削除を、1回のファイル書き込みにまとめるために使います。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_id (str): 対象アイテムのID。
+        deltas (list[dict]): 操作のリスト。各操作の形式は append_history_delta と同じ。
+
+    Returns:
+        bool: 書き込みが成功した場合 (操作が空の場合を含む) は True、失敗した場合は False。
+              不明な操作が含まれる場合は何も書き込まずに False を返します。
+    """
+    for delta in deltas:
+        if delta.get("op") not in ("replace", "delete"):
+            print(f"Error: Unknown history delta operation '{delta.get('op')}'.")
+            return False
+    if not deltas:
+        return True
+    return _append_history_log_lines(project_dir_name, category_name, item_id, deltas)
+
+def _append_history_log_lines(project_dir_name: str, category_name: str, item_id: str, records: list[dict]) -> bool:
+    """追記ログの末尾に記録 (履歴エントリまたは操作) を1回の write でまとめて書き込みます。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_id (str): 対象アイテムのID。
+        records (list[dict]): 書き込む記録のリスト (この順に1行ずつ書き込む)。
+
+    Returns:
+        bool: 書き込みが成功した場合は True、失敗した場合は False。
+    """
+    if not project_dir_name or not category_name or not item_id:
+        print("Error: Project name, category name, and item ID are required to append history.")
+        return False
+    log_path = get_history_log_filepath(project_dir_name, category_name, item_id)
+    try:
+        with _DATA_WRITE_LOCK: # 履歴全体の書き戻し (update_item によるログの削除) と重ならないようにする
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            with open(log_path, 'ab') as f:
+                f.write(b"".join(_dumps_json_line(record) for record in records))
+            _compact_history_log(project_dir_name, category_name, item_id)
+        return True
+    except Exception as e:
+        print(f"Error appending history log for item '{item_id}' in category '{category_name}', project '{project_dir_name}': {e}")
+        return False
+
+def _compact_history_log(project_dir_name: str, category_name: str, item_id: str) -> bool:
+    """追記ログの行数が HISTORY_LOG_COMPACT_THRESHOLD を超えていれば、履歴全体を本体へ書き戻してログを削除します。
+
+    ログへの追記の直後に呼ばれます。書き戻しに失敗してもログはそのまま残るため、
+    履歴は失われず、次の追記時に再び書き戻しを試みます。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_id (str): 対象アイテムのID。
+
+    Returns:
+        bool: 書き戻しが不要だった場合または成功した場合は True、失敗した場合は False。
+    """
+    data_signature = _file_signature(get_category_filepath(project_dir_name, category_name))
+    log_signature = _file_signature(get_history_log_filepath(project_dir_name, category_name, item_id))
+    if data_signature is None or log_signature is None:
+        return True
+    try:
+        item, log_line_count = _load_item_snapshot(project_dir_name, category_name, item_id, data_signature, log_signature)
+    except Exception as e:
+        print(f"Warning: Could not check history log size for item '{item_id}' in category '{category_name}', project '{project_dir_name}': {e}")
+        return False
+    if not isinstance(item, dict) or log_line_count <= HISTORY_LOG_COMPACT_THRESHOLD:
+        return True
+    # update_item が本体を書き込んだあとにログを削除する (キャッシュの履歴は共有されているのでコピーを渡す)
+    if update_item(project_dir_name, category_name, item_id, {"history": copy.deepcopy(item.get('history', []))}):
+        return True
+    print(f"Warning: Failed to compact history log for item '{item_id}' in category '{category_name}', project '{project_dir_name}'. The log is kept.")
+    return False
+
+def load_history_log(project_dir_name: str, category_name: str, item_id: str) -> list[dict]:
+    """アイテムの履歴追記ログ (JSONL) を1行ずつ読み込み、記録のリストを返します。
+
+    記録は追加された履歴エントリか、"op" キーを持つ編集・削除の操作 (append_history_delta) です。
+    不正な行は警告を出してスキップします。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_id (str): 対象アイテムのID。
+
+    Returns:
+        list[dict]: 追記ログ内の記録のリスト (ログ内の順序どおり)。ログがなければ空リスト。
+    """
+    log_path = get_history_log_filepath(project_dir_name, category_name, item_id)
+    if not os.path.exists(log_path):
+        return []
+    entries = []
+    try:
+        with open(log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = orjson.loads(line) if orjson is not None else json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Warning: Skipping malformed history log line in '{log_path}'.")
+                    continue
+                if isinstance(entry, dict):
+                    entries.append(entry)
+    except Exception as e:
+        print(f"Error loading history log '{log_path}': {e}")
+    return entries
+
+def clear_history_log(project_dir_name: str, category_name: str, item_id: str) -> None:
+    """アイテムの履歴追記ログが存在すれば削除します。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_id (str): 対象アイテムのID。
+    """
+    log_path = get_history_log_filepath(project_dir_name, category_name, item_id)
+    try:
+        with _DATA_WRITE_LOCK: # 追記中のログを削除しないようにする
+            if os.path.exists(log_path):
+                os.remove(log_path)
+    except Exception as e:
+        print(f"Error removing history log '{log_path}': {e}")
+
+def _merge_history_log(project_dir_name: str, category_name: str, item_id: str, item: dict) -> int:
+    """追記ログの記録を順に、アイテム辞書の 'history' に適用します (in-place)。
+
+    履歴エントリは末尾に追加し、編集・削除の操作は対象のエントリに適用します。
+    操作の対象は履歴IDから位置への辞書で引き、削除したエントリは最後にまとめて取り除くため、
+    ログの件数が多くても履歴全体を何度も走査しません。
+
+    Args:
+        project_dir_name (str): 対象プロジェクトのディレクトリ名。
+        category_name (str): 対象アイテムのカテゴリ名。
+        item_id (str): 対象アイテムのID。
+        item (dict): 適用先のアイテム辞書。
+
+    Returns:
+        int: 追記ログの記録の件数 (コンパクションの判定用)。
+    """
+    log_records = load_history_log(project_dir_name, category_name, item_id)
+    if not log_records:
+        return 0
+    base_history = item.get('history')
+    history = list(base_history) if isinstance(base_history, list) else []
+    # 削除したエントリは None にしておき、位置をずらさない (index_by_id を作り直さずに済む)
+    index_by_id = {h.get("id"): i for i, h in enumerate(history) if isinstance(h, dict) and h.get("id")}
+    for record in log_records:
+        op = record.get("op")
+        if op is None:
+            if record.get("id"):
+                index_by_id[record["id"]] = len(history)
+            history.append(record) # 追加された履歴エントリ
+            continue
+        index = _find_history_delta_target(history, index_by_id, record)
+        if index is None:
+            print(f"Warning: History entry for '{op}' operation not found in item '{item_id}'. Skipping.")
+        elif op == "replace":
+            history[index] = {**history[index], "entry": record.get("entry", "")}
+        elif op == "delete":
+            index_by_id.pop(history[index].get("id"), None)
+            history[index] = None
+    item['history'] = [h for h in history if h is not None]
+    return len(log_records)
+
+def _find_history_delta_target(history: list, index_by_id: dict, delta: dict) -> int | None:
+    """履歴の操作 (delta) の対象となるエントリの、history 内の位置を返します。
+
+    Args:
+        history (list): 操作を適用中の履歴エントリのリスト (削除済みの位置は None)。
+        index_by_id (dict): 履歴IDから history 内の位置への辞書。
+        delta (dict): append_history_delta で書き込まれた操作。
+
+    Returns:
+        int | None: 対象エントリのインデックス。見つからなければ None。
+    """
+    entry_id = delta.get("id")
+    if entry_id:
+        return index_by_id.get(entry_id)
+    # IDを持たない古いエントリは、削除済みを除いた記録時の位置で照合する
+    index = delta.get("index")
+    if not isinstance(index, int) or index < 0:
+        return None
+    for i, h_entry in enumerate(history):
+        if h_entry is None:
+            continue
+        if index == 0:
+            return i
+        index -= 1
+    return None
 
 def update_tags(project_dir_name: str, category_name: str, item_id: str, tags_list: list[str]) -> bool:
     """指定されたアイテムのタグリストを新しいリストで上書きします。
@@ -558,7 +1059,8 @@ def find_items_by_tags(project_dir_name: str, tags_to_find: list[str], case_inse
                         for key in ITEM_SUMMARY_KEYS: # 定義されたキーを抽出
                             item_summary[key] = item_data.get(key, "")
                         
-                        # 最新の履歴エントリを抽出
+                        # 最新の履歴エントリを抽出 (追記ログの分も含める)
+                        _merge_history_log(project_dir_name, category_name, item_id, item_data)
                         recent_history = item_data.get("history", [])
                         if isinstance(recent_history, list): # 念のためリストであることを確認
                             item_summary["recent_history"] = [
@@ -635,6 +1137,12 @@ if __name__ == '__main__':
     assert update_item(test_project, cat_chars, char1_id, update_desc_char1) is True, "アリス更新失敗"
     updated_char1 = get_item(test_project, cat_chars, char1_id)
     assert updated_char1.get("description") == update_desc_char1["description"], "アリスの説明が更新されていない"
+    updated_char1["description"] = "(呼び出し側での変更)"
+    assert get_item(test_project, cat_chars, char1_id).get("description") == update_desc_char1["description"], "get_item のキャッシュが呼び出し側の変更の影響を受けた"
+    # 値が変わらない更新ではファイルを書き直さない
+    char_file_mtime = os.path.getmtime(get_category_filepath(test_project, cat_chars))
+    assert update_item(test_project, cat_chars, char1_id, update_desc_char1) is True, "変更なしの更新が失敗扱いになった"
+    assert os.path.getmtime(get_category_filepath(test_project, cat_chars)) == char_file_mtime, "変更なしの更新でファイルが書き直された"
     # print(f"  キャラクター 'アリス' 更新後の説明: {updated_char1.get('description')}")
 
     # 7. 履歴追加テスト
@@ -644,8 +1152,49 @@ if __name__ == '__main__':
     char1_with_history = get_item(test_project, cat_chars, char1_id)
     assert len(char1_with_history.get("history", [])) == 1, "履歴エントリ数が期待と異なる"
     assert char1_with_history["history"][0]["entry"] == history_entry1, "履歴内容が不一致"
+    assert load_history_log(test_project, cat_chars, char1_id)[0]["entry"] == history_entry1, "履歴が追記ログに書き込まれていない"
+    # 履歴全体を update_item で書き込むと、追記ログは本体に統合されて削除される
+    assert update_item(test_project, cat_chars, char1_id, {"history": char1_with_history["history"]}) is True, "履歴のコンパクション失敗"
+    assert load_history_log(test_project, cat_chars, char1_id) == [], "コンパクション後も追記ログが残っている"
+    assert len(get_item(test_project, cat_chars, char1_id).get("history", [])) == 1, "コンパクション後の履歴エントリ数が期待と異なる"
+    # 編集・削除は操作として追記ログに書き込まれ、読み込み時に適用される
+    history_entry1_id = char1_with_history["history"][0]["id"]
+    assert add_history_entry(test_project, cat_chars, char1_id, "宝箱を開けた。") is True, "アリスへの履歴追加失敗"
+    assert append_history_delta(test_project, cat_chars, char1_id,
+                                {"op": "replace", "id": history_entry1_id, "index": 0, "entry": "竜の洞窟を発見した。"}) is True, "履歴編集の追記失敗"
+    assert append_history_delta(test_project, cat_chars, char1_id,
+                                {"op": "delete", "id": history_entry1_id, "index": 0}) is True, "履歴削除の追記失敗"
+    replayed_history = get_item(test_project, cat_chars, char1_id).get("history", [])
+    assert [h["entry"] for h in replayed_history] == ["宝箱を開けた。"], "追記ログの操作が正しく適用されていない"
+    # 複数の操作を1回でまとめて書き込む (順序どおりに適用される)
+    remaining_entry_id = replayed_history[0]["id"]
+    assert append_history_deltas(test_project, cat_chars, char1_id, [
+        {"op": "replace", "id": remaining_entry_id, "index": 0, "entry": "宝箱は空だった。"},
+        {"op": "replace", "id": remaining_entry_id, "index": 0, "entry": "宝箱から金貨を見つけた。"},
+    ]) is True, "履歴操作のまとめ書き込み失敗"
+    assert [h["entry"] for h in get_item(test_project, cat_chars, char1_id).get("history", [])] == ["宝箱から金貨を見つけた。"], \
+        "まとめて書き込んだ操作が順序どおりに適用されていない"
+    assert append_history_deltas(test_project, cat_chars, char1_id, [{"op": "move"}]) is False, "不明な操作が書き込まれた"
+    # 読み込みではファイルを書き換えず、追記ログが閾値を超えたら追記時に本体へ書き戻す
+    char_file_mtime = os.path.getmtime(get_category_filepath(test_project, cat_chars))
+    get_item(test_project, cat_chars, char1_id)
+    assert os.path.getmtime(get_category_filepath(test_project, cat_chars)) == char_file_mtime, "get_item がファイルを書き換えた"
+    for i in range(HISTORY_LOG_COMPACT_THRESHOLD):
+        assert add_history_entry(test_project, cat_chars, char1_id, f"探索 {i}") is True, "アリスへの履歴追加失敗"
+    assert len(load_history_log(test_project, cat_chars, char1_id)) < HISTORY_LOG_COMPACT_THRESHOLD, "追記ログが閾値を超えても本体に書き戻されていない"
+    assert len(get_item(test_project, cat_chars, char1_id).get("history", [])) == HISTORY_LOG_COMPACT_THRESHOLD + 1, \
+        "書き戻し後の履歴エントリ数が期待と異なる"
     # print(f"  アリスの履歴: {char1_with_history['history'][0]['entry']}")
 
+    # 7-2. 読みやすい形式での書き出しテスト
+    export_path = os.path.join(os.path.dirname(test_project_path), "export_test.json")
+    assert export_item_pretty(test_project, cat_chars, char1_id, export_path) is True, "アイテムの書き出し失敗"
+    assert _read_json_file(export_path)["id"] == char1_id, "書き出したアイテムの内容が不一致"
+    # 書き直したファイルは元のパーミッションを引き継ぐ
+    os.chmod(export_path, 0o640)
+    assert export_item_pretty(test_project, cat_chars, char1_id, export_path) is True, "アイテムの再書き出し失敗"
+    assert stat.S_IMODE(os.stat(export_path).st_mode) == 0o640, "書き直したファイルのパーミッションが変わった"
+
     # 8. タグ更新テスト
     # print("\n8. タグ更新テスト:")
     new_tags_item1 = ["回復", "貴重品"]
@@ -658,6 +1207,23 @@ if __name__ == '__main__':
     # print("\n9. アイテム削除テスト:")
     assert delete_item(test_project, cat_chars, char1_id) is True, "アリス削除失敗"
     assert get_item(test_project, cat_chars, char1_id) is None, "アリス削除後も取得できてしまう"
+    # 読み込みの失敗はキャッシュされず、同じファイルの状態のままでも次の呼び出しで読み直す
+    items_file = get_category_filepath(test_project, cat_items)
+    with open(items_file, 'rb') as f:
+        items_content = f.read()
+    with open(items_file, 'wb') as f:
+        f.write(items_content[:-1] + b" ") # 書き込み途中のような不正な内容 (サイズは同じ)
+    broken_mtime_ns = os.stat(items_file).st_mtime_ns
+    assert get_item(test_project, cat_items, item1_id) is None, "不正な内容のファイルからアイテムを取得できてしまう"
+    with open(items_file, 'wb') as f:
+        f.write(items_content)
+    os.utime(items_file, ns=(broken_mtime_ns, broken_mtime_ns)) # キャッシュのキーを失敗時と同じにする
+    assert get_item(test_project, cat_items, item1_id) is not None, "読み込みの失敗がキャッシュされている"
+    # 一括削除では、削除したアイテムの追記ログも削除される
+    bulk_ids = [add_item(test_project, cat_chars, {"name": f"モブ{i}"}) for i in range(2)]
+    assert add_history_entry(test_project, cat_chars, bulk_ids[0], "通りすがった。") is True, "モブへの履歴追加失敗"
+    assert delete_items(test_project, cat_chars, bulk_ids + ["missing_id"]) == 2, "一括削除の件数が期待と異なる"
+    assert not os.path.exists(get_history_log_filepath(test_project, cat_chars, bulk_ids[0])), "一括削除後も追記ログが残っている"
     # print(f"  キャラクター 'アリス' 削除成功。")
     assert len(list_items(test_project, cat_chars)) == 0, "キャラクター削除後も一覧に残っている"
 
@@ -2,7 +2,9 @@
 
 import sys
 import os
+import logging
 from PyQt5.QtWidgets import QApplication, qApp
+from PyQt5.QtGui import QPixmapCache
 from PyQt5.QtCore import Qt
 from typing import Optional # Optional をインポート
 from ui.main_window import MainWindow # MainWindow をインポート
@@ -26,6 +28,15 @@ if __name__ == '__main__':
     
     app = QApplication(sys.argv)
 
+    # ログの出力レベル (既定は WARNING)。環境変数 TRPG_AI_TOOL_LOG_LEVEL=DEBUG でデバッグ出力を有効化できる
+    logging.basicConfig(
+        level=os.environ.get("TRPG_AI_TOOL_LOG_LEVEL", "WARNING").upper(),
+        format="%(levelname)s %(name)s: %(message)s"
+    )
+
+    # 画像プレビューのデコード結果を共有する QPixmapCache の上限 (KB単位、32MB)
+    QPixmapCache.setCacheLimit(32768)
+
     # --- ★★★ 外部スタイルシートの読み込みと適用 ★★★ ---
     qss_file_path = os.path.join(project_root, "ui", "style.qss")
     try:
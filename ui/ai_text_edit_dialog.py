@@ -109,6 +109,24 @@ class AIAssistedEditDialog(QDialog):
         layout.addWidget(self.processing_label)
 
 
+    def reset(self, instruction_text: str, window_title: str | None = None):
+        """ダイアログを再利用するために、表示内容を初期状態に戻します。
+
+        指示入力エリアを指定のテキストで置き換え、AIの提案エリアを空にし、
+        処理中表示を解除します。
+
+        Args:
+            instruction_text (str): AIへの指示入力エリアに表示するテキスト。
+            window_title (str | None, optional): 新しいウィンドウタイトル。
+                                                 None の場合は現在のタイトルを維持します。
+        """
+        if window_title is not None:
+            self.setWindowTitle(window_title)
+        self.instruction_edit.setPlainText(instruction_text)
+        self.suggestion_edit.clear()
+        self.processing_label.setVisible(False)
+        self.request_ai_button.setEnabled(True)
+
     def get_instruction_text(self) -> str:
         """AIへの指示入力エリアの現在のテキストを取得します。
 
@@ -28,7 +28,7 @@ if project_root not in sys.path:
 # --- coreモジュールインポート ---
 from core.data_manager import (
     list_categories, list_items, get_item, add_item, update_item, delete_item,
-    create_category, load_data_category, save_data_category # 明示的に使用するものをインポート
+    create_category, delete_items # 明示的に使用するものをインポート
 )
 # --- uiモジュールインポート ---
 from ui.detail_window import DetailWindow
@@ -377,26 +377,15 @@ class DataManagementWidget(QWidget):
                                    QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
             deleted_count = 0
-            # カテゴリデータを一度ロードし、メモリ上で変更後、一括で保存する
-            category_data = load_data_category(self.current_project_dir_name, current_category_name)
-            if category_data is None: # 読み込み失敗
-                QMessageBox.critical(self, "データエラー", f"カテゴリ '{current_category_name}' のデータの読み込みに失敗したため、削除処理を中止します。")
-                return
-
-            items_actually_deleted_from_data = 0
-            for item_id in ids_to_delete:
-                if item_id in category_data:
-                    del category_data[item_id]
-                    items_actually_deleted_from_data +=1
-            
+            # カテゴリデータを一度ロードし、メモリ上で変更後、一括で保存する (削除したアイテムの追記ログも削除される)
+            items_actually_deleted_from_data = delete_items(self.current_project_dir_name, current_category_name, ids_to_delete)
+            if items_actually_deleted_from_data is None: # 読み込みまたは保存に失敗
+                QMessageBox.warning(self, "削除エラー", f"カテゴリ '{current_category_name}' のアイテム削除に失敗しました。データが不整合な状態になっている可能性があります。")
+                return # 以降の処理を中断
+
             if items_actually_deleted_from_data > 0:
-                if save_data_category(self.current_project_dir_name, current_category_name, category_data):
-                    QMessageBox.information(self, "削除完了", f"{items_actually_deleted_from_data} 個のアイテムを削除しました。")
-                    deleted_count = items_actually_deleted_from_data
-                else:
-                    QMessageBox.warning(self, "保存エラー", "アイテム削除後のデータ保存に失敗しました。データが不整合な状態になっている可能性があります。")
-                    # 失敗時はリフレッシュしない方が良いかもしれない
-                    return # 以降の処理を中断
+                QMessageBox.information(self, "削除完了", f"{items_actually_deleted_from_data} 個のアイテムを削除しました。")
+                deleted_count = items_actually_deleted_from_data
             elif ids_to_delete: # チェックはあったが、データには存在しなかった場合
                  QMessageBox.information(self, "削除なし", "チェックされたアイテムはデータ内に見つかりませんでした（既に削除されたか、データ不整合の可能性）。")
 
@@ -437,9 +426,9 @@ class DataManagementWidget(QWidget):
         elif self._detail_window.current_project_dir_name != self.current_project_dir_name:
             # DetailWindowが既に存在するが、DataManagementWidgetのプロジェクトが変わった場合
             # DetailWindowのプロジェクトも更新する
-            self._detail_window.current_project_dir_name = self.current_project_dir_name
-            # 必要ならDetailWindowの表示内容もクリア
+            # (表示中のアイテムの保留中の履歴は元のプロジェクトに保存されるよう、先に表示内容をクリアする)
             self._detail_window.clear_view()
+            self._detail_window.current_project_dir_name = self.current_project_dir_name
             print(f"DetailWindow project updated to '{self.current_project_dir_name}'.")
 
 
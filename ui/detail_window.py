@@ -9,14 +9,18 @@ AIによる説明文の編集支援機能や、AI支援による履歴追記機
 
 import sys
 import os
+import logging
+import functools
+import shutil
+from collections import OrderedDict, deque
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTextEdit,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPlainTextEdit,
     QPushButton, QScrollArea, QFrame, QFileDialog, QMessageBox, QDialog,
-    QSizePolicy, QSpacerItem, QInputDialog, QApplication, qApp
+    QSizePolicy, QSpacerItem, QInputDialog, QApplication, QListView, QAbstractItemView, QMenu
 )
-from PyQt5.QtGui import QPixmap, QImageReader, QResizeEvent, QShowEvent
-from PyQt5.QtCore import Qt, pyqtSignal, QUrl, QTimer
-from typing import Optional
+from PyQt5.QtGui import QPixmap, QPixmapCache, QImage, QImageReader, QImageIOHandler, QResizeEvent, QShowEvent, QMovie
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QSize, QThread
+from typing import Optional, TYPE_CHECKING
 
 
 
@@ -27,14 +31,232 @@ if project_root not in sys.path:
 
 
 # --- coreモジュールインポート ---
-from core.data_manager import get_item, update_item, add_history_entry
-from core.gemini_handler import GeminiChatHandler, is_configured as gemini_is_configured 
+from core.data_manager import (
+    get_item, update_item, create_history_entry, append_history_log_entry, append_history_deltas,
+    export_item_pretty, ensure_project_images_dir_exists, IMAGES_SUBDIR_NAME
+)
 from core.shared_instances import get_main_window_instance 
-from core.config_manager import DEFAULT_PROJECT_SETTINGS, get_category_template
+from core.config_manager import DEFAULT_PROJECT_SETTINGS, PROJECTS_BASE_DIR, get_category_template, load_project_settings
+# core.gemini_handler (google.generativeai を読み込む) はAI機能の使用時にのみインポートする
 
 # --- uiモジュールインポート ---
-from ui.ai_text_edit_dialog import AIAssistedEditDialog
+from ui.history_edit_dialog import HistoryEditDialog, history_entry_preview, history_entry_choices
+from ui.history_list_view import HistoryListModel, HistoryItemDelegate
+from ui.tag_chip_edit import TagChipEdit
+# AIAssistedEditDialog は初回使用時 (_get_shared_ai_dialog) にインポートする
+if TYPE_CHECKING:
+    from ui.ai_text_edit_dialog import AIAssistedEditDialog
+
+
+log = logging.getLogger(__name__)
+"""logging.Logger: このモジュールのデバッグ出力用ロガー。既定では WARNING 未満は出力されない (main.py 参照)。"""
+
+
+# --- 画像プレビューの縮小デコード閾値 ---
+LARGE_IMAGE_FILE_SIZE_BYTES = 2 * 1024 * 1024 # これを超えるファイルはデコード時に縮小する
+LARGE_IMAGE_PIXEL_COUNT = 4_000_000 # これを超える画素数の画像はデコード時に縮小する
+SCALED_PREVIEW_CACHE_SIZE = 8 # 表示幅ごとにキャッシュするスケーリング済みプレビューの最大数
+IMAGE_COPY_BUFFER_SIZE = 4 * 1024 * 1024 # 画像ファイルをプロジェクトにコピーする際の読み書きバッファサイズ
+PREVIEW_RESIZE_DEBOUNCE_MS = 150 # リサイズが止まってから高品質な再スケーリングを行うまでの待ち時間 (ミリ秒)
+PREVIEW_FAST_RESCALE_MIN_DELTA = 8 # リサイズ中の暫定スケーリングを行う最小の幅の変化量 (px)
+EDITABLE_TEXT_FIELDS = ('name', 'description', 'tags', 'reference_tags') # 変更フラグで編集を検出する入力欄
+STATUS_MESSAGE_TIMEOUT_MS = 3000 # ステータスラベルのメッセージを表示しておく時間 (ミリ秒)
+HISTORY_DELTA_FLUSH_DELAY_MS = 200 # 履歴の編集・削除を追記ログにまとめて書き込むまでの待ち時間 (ミリ秒)
+
+# --- AIによる履歴エントリ生成の指示テンプレート ---
+HISTORY_CONTEXT_MAX_ENTRIES = 10 # 指示に含める既存履歴の最大件数
+HISTORY_TEMPLATE_MAX_ENTRIES = 5 # テンプレートの {max_item_history_entries} に渡す値
+HISTORY_INSTRUCTION_FALLBACK_TEMPLATE = "アイテム「{item_name}」の新しい履歴エントリを作成してください。ユーザーの指示を考慮してください。"
 
+# --- 履歴の削除ダイアログの文言 ---
+HISTORY_DELETE_DIALOG_TITLE = "履歴削除"
+HISTORY_DELETE_PROMPT = "削除する履歴を選択してください:"
+HISTORY_DELETE_CONFIRM_TITLE = "履歴削除確認"
+HISTORY_DELETE_CONFIRM_FORMAT = "以下の履歴エントリ ({number}) を本当に削除しますか？\n\n「{preview}」\n\nこの操作は元に戻せません。"
+
+# --- AIによる説明/メモ新規作成の指示テンプレート ---
+DESCRIPTION_TEMPLATE_CACHE_SIZE = 16 # カテゴリ別の雛形を埋め込み済みのテンプレートをキャッシュする最大数
+
+
+@functools.lru_cache(maxsize=DESCRIPTION_TEMPLATE_CACHE_SIZE)
+def _resolve_description_new_template(prompt_template: str, empty_template_full_text: str, category: str) -> str:
+    """説明/メモ新規作成用のテンプレートに、カテゴリ別の雛形を埋め込みます。
+
+    雛形の抽出 (get_category_template) はテンプレート全体を正規表現で走査するため、
+    設定とカテゴリが同じであれば前回の結果を再利用します。
+
+    Args:
+        prompt_template (str): プロジェクト設定の description_new テンプレート。
+        empty_template_full_text (str): プロジェクト設定の empty_description_template (全カテゴリ分)。
+        category (str): アイテムのカテゴリ名。
+
+    Returns:
+        str: {empty_description_template} を雛形で置き換えたテンプレート。
+             プレースホルダがない場合は雛形そのもの。{item_name} は置き換えない。
+    """
+    category_specific_empty_template = get_category_template(category, empty_template_full_text)
+    if not category_specific_empty_template:
+        # カテゴリ別テンプレートがない場合、デフォルトの全体を使用
+        category_specific_empty_template = empty_template_full_text
+    if "{empty_description_template}" in prompt_template:
+        return prompt_template.replace("{empty_description_template}", category_specific_empty_template)
+    # description_new に雛形テンプレートのプレースホルダがない場合、直接雛形を使う (フォールバック)
+    print("警告: description_new プロンプトに {empty_description_template} プレースホルダがありません。empty_description_template を直接使用します。")
+    return category_specific_empty_template # この場合、指示プロンプトなしで雛形のみになる
+
+def _height_for_width(size: QSize, width: int) -> int:
+    """アスペクト比を維持して指定幅に縮小・拡大したときの高さを返します。
+
+    Args:
+        size (QSize): 元の画像サイズ。
+        width (int): 表示する幅。
+
+    Returns:
+        int: 表示する高さ (1以上)。元の幅が0以下の場合は幅と同じ値 (縦横比 1:1 とみなす)。
+    """
+    if size.width() <= 0:
+        return max(1, width)
+    return max(1, int(width * size.height() / size.width()))
+
+
+# ==============================================================================
+# アイテム保存用ワーカースレッド
+# ==============================================================================
+class ItemSaveWorker(QThread):
+    """アイテムの変更内容をバックグラウンドでファイルに保存するワーカースレッド。
+
+    カテゴリファイルへの書き込みは data_manager 側のロックで直列化されるため、
+    保存中にGUIスレッドから他のアイテムを追加・削除しても変更は失われません。
+    """
+    save_finished = pyqtSignal(bool)  # 保存が成功したかどうか
+
+    def __init__(self, project_dir_name: str, category: str, item_id: str,
+                 payload: dict, parent=None):
+        super().__init__(parent)
+        self.project_dir_name = project_dir_name
+        self.category = category
+        self.item_id = item_id
+        self.payload = payload
+
+    def run(self):
+        try:
+            success = update_item(self.project_dir_name, self.category, self.item_id, self.payload)
+        except Exception as e:
+            print(f"Error in ItemSaveWorker: {e}")
+            success = False
+        self.save_finished.emit(bool(success))
+
+
+# ==============================================================================
+# 大きな画像のデコード用ワーカースレッド
+# ==============================================================================
+class ImageDecodeWorker(QThread):
+    """プレビュー用の画像をバックグラウンドでデコードし、表示幅へのスケーリングまで行うワーカースレッド。
+
+    QPixmap はGUIスレッドでしか扱えないため、ここでは QImage までを作成し、
+    QPixmap への変換は結果を受け取ったGUIスレッド側で行います。
+    """
+    image_decoded = pyqtSignal(str, QImage, QImage)  # (キャッシュキー, デコード結果, 表示幅に縮小した画像)。失敗時は null の QImage
+
+    def __init__(self, image_path: str, cache_key: str, target_width: int,
+                 scaled_size: QSize | None = None, relative_image_path: str = "", parent=None):
+        super().__init__(parent)
+        self.image_path = image_path
+        self.cache_key = cache_key
+        self.target_width = target_width # プレビューの表示幅 (物理ピクセル)
+        self.scaled_size = scaled_size # デコード時に縮小するサイズ (None なら原寸)
+        self.relative_image_path = relative_image_path # 表示用の相対パス
+
+    def run(self):
+        reader = QImageReader(self.image_path)
+        reader.setAutoTransform(True) # EXIF の回転情報を反映する
+        if self.scaled_size is not None:
+            reader.setScaledSize(self.scaled_size)
+        image = reader.read()
+        # 描画・スケーリングが最適化されている形式への変換もワーカー側で済ませておく
+        if not image.isNull() and image.format() != QImage.Format_ARGB32_Premultiplied:
+            image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        # 表示幅への高品質スケーリングもGUIスレッドで行わずに済むようにする
+        if not image.isNull() and image.width() != self.target_width:
+            preview_image = image.scaledToWidth(self.target_width, Qt.SmoothTransformation)
+        else:
+            preview_image = image
+        self.image_decoded.emit(self.cache_key, image, preview_image)
+
+
+# ==============================================================================
+# 画像ファイルのコピー用ワーカースレッド
+# ==============================================================================
+class ImageCopyWorker(QThread):
+    """選択された画像ファイルをプロジェクトの画像フォルダへバックグラウンドでコピーするワーカースレッド。"""
+    copy_finished = pyqtSignal(str)  # エラーメッセージ (成功時は空文字列)
+
+    def __init__(self, source_path: str, destination_path: str, relative_image_path: str,
+                 category: str, item_id: str, parent=None):
+        super().__init__(parent)
+        self.source_path = source_path
+        self.destination_path = destination_path
+        self.relative_image_path = relative_image_path # アイテムに保存する相対パス
+        self.category = category # コピー開始時のアイテム (完了時の照合用)
+        self.item_id = item_id
+
+    def run(self):
+        try:
+            # 同じファイルならコピーしない (移動やリネームの場合を考慮)
+            # パス文字列が同じなら stat せずに判定し、コピー先がない場合 (新しい画像) は samefile を呼ばない
+            if (os.path.abspath(self.source_path) == os.path.abspath(self.destination_path)
+                    or (os.path.exists(self.destination_path)
+                        and os.path.samefile(self.source_path, self.destination_path))):
+                log.debug("Image '%s' already exists in project and is the same file. No copy needed.", os.path.basename(self.destination_path))
+            else:
+                # 大きめのバッファでまとめて読み書きし、システムコールの回数を減らす
+                # (バッファは copyfileobj 側の1つで足りるため、ファイルオブジェクトのバッファリングは無効にする。
+                #  アプリではファイルの権限や更新日時を使わないので、copystat によるメタデータのコピーもしない)
+                with open(self.source_path, 'rb', buffering=0) as src, \
+                        open(self.destination_path, 'wb', buffering=0) as dst:
+                    shutil.copyfileobj(src, dst, length=IMAGE_COPY_BUFFER_SIZE)
+                log.debug("Image copied from '%s' to '%s'", self.source_path, self.destination_path)
+            self.copy_finished.emit("")
+        except Exception as e:
+            self.copy_finished.emit(str(e))
+
+
+# ==============================================================================
+# AI編集支援の応答取得用ワーカースレッド
+# ==============================================================================
+class AISuggestionWorker(QThread):
+    """AI編集支援ダイアログ用の応答をバックグラウンドで取得するワーカースレッド。"""
+    suggestion_finished = pyqtSignal(object, object)  # (応答テキスト or None, エラーメッセージ or None)
+
+    def __init__(self, chat_handler, request_serial: int,
+                 user_instruction: str,
+                 item_context: Optional[str],
+                 chat_history_to_include: Optional[list],
+                 max_history_pairs: Optional[int],
+                 override_model_name: Optional[str],
+                 parent=None):
+        super().__init__(parent)
+        self.chat_handler = chat_handler
+        self.request_serial = request_serial # どの依頼に対する応答かを識別する番号
+        self.user_instruction = user_instruction
+        self.item_context = item_context
+        self.chat_history_to_include = chat_history_to_include
+        self.max_history_pairs = max_history_pairs
+        self.override_model_name = override_model_name
+
+    def run(self):
+        try:
+            response_text, error_message, _usage_data = self.chat_handler.generate_response_with_history_and_context(
+                user_instruction=self.user_instruction,
+                item_context=self.item_context,
+                chat_history_to_include=self.chat_history_to_include,
+                max_history_pairs=self.max_history_pairs,
+                override_model_name=self.override_model_name
+            )
+        except Exception as e:
+            print(f"Error in AISuggestionWorker: {e}")
+            response_text, error_message = None, str(e)
+        self.suggestion_finished.emit(response_text, error_message)
 
 
 class DetailWindow(QWidget):
@@ -96,14 +318,88 @@ class DetailWindow(QWidget):
 
         self.detail_widgets: dict[str, QWidget] = {} # UIウィジェットを保持
         """dict: 表示/編集フィールド名とそのUIウィジェットのマッピング。"""
-        self.ai_edit_dialog: AIAssistedEditDialog | None = None
+        self.ai_edit_dialog: 'AIAssistedEditDialog | None' = None
+        self._shared_ai_dialog: 'AIAssistedEditDialog | None' = None
+        """AIAssistedEditDialog | None: 説明編集・履歴追加で使い回すAI編集支援ダイアログ。初回使用時に生成。"""
+        self._cached_message_box: QMessageBox | None = None
+        """QMessageBox | None: 情報・警告・確認の表示で使い回すメッセージボックス。初回表示時に先に生成しておく。"""
+        self._ai_workers: list[AISuggestionWorker] = []
+        """list: 実行中のAI応答取得ワーカー (完了まで参照を保持する)。"""
+        self._ai_request_serial: int = 0
+        """int: AI編集支援ダイアログを開くたびに増える番号。古い依頼の応答を破棄するために使う。"""
+        self._main_window_cached = None
+        """MainWindow | None: _main_window() で解決済みのメインウィンドウ。"""
         self.ai_edit_dialog_mode: str | None = None # ★ AI編集ダイアログのモード
         """str | None: AI編集支援ダイアログが何の編集に使われているか ('description' or 'history')"""
 
+        self._pending_load: tuple[str, str] | None = None
+        """tuple | None: 非表示中に要求された (category, item_id)。表示時 (showEvent) に読み込む。"""
+        self._last_history_item_key: tuple | None = None
+        """tuple | None: 履歴表示に描画済みのアイテム (プロジェクト, カテゴリ, ID)。"""
+
+        self._history_dirty: bool = False
+        """bool: 履歴の編集・削除がメモリ上にのみ反映され、まだファイルに保存されていないかどうか。"""
+
+        self._image_path_dirty: bool = False
+        """bool: 画像の選択・クリアにより image_path が変更され、まだ保存されていないかどうか。"""
+        self._saved_image_path: str | None = None
+        """str | None: ファイルに保存されている image_path (ロード時・保存成功時に記録)。変更の判定に使う。"""
+        self._save_worker: ItemSaveWorker | None = None
+        """ItemSaveWorker | None: 実行中の保存ワーカー。保存中でなければ None。"""
+        self._loaded_tag_sets: dict[str, frozenset] = {}
+        """dict: タグ系フィールド名と、ロード(または保存)時点のタグ集合のマッピング。"""
+
+        self._recent_history_lines: deque[str] = deque(maxlen=HISTORY_CONTEXT_MAX_ENTRIES)
+        """deque: AI履歴生成の指示に含める、整形済みの直近履歴行 (古い順)。"""
+        self._chat_hist_cache: tuple[int, int | None, list] | None = None
+        """tuple | None: (chat_history_revision, max_history_pairs, 切り詰め済み会話履歴) のキャッシュ。"""
+
         self._original_image_pixmap: QPixmap | None = None
         """QPixmap | None: 読み込んだ画像のスケーリングされていないオリジナルピクスマップ。"""
-
-        # --- ★★★ 画像ボタンの重複作成を防ぐためのメンバ変数 ★★★ ---
+        self._preview_movie: QMovie | None = None
+        """QMovie | None: GIF画像をプレビュー表示している場合のムービー。"""
+        self._original_image_reduced: bool = False
+        """bool: _original_image_pixmap がデコード時に縮小されたものかどうか。"""
+        self._scaled_cache: OrderedDict[int, QPixmap] = OrderedDict()
+        """OrderedDict: 表示幅をキーとした SmoothTransformation 済みプレビューのLRUキャッシュ。"""
+        self._pending_decode_key: str | None = None
+        """str | None: ワーカースレッドでデコード中の、現在表示すべき画像のキャッシュキー。"""
+        self._image_decode_workers: list[ImageDecodeWorker] = []
+        """list: 実行中の画像デコードワーカー (完了まで参照を保持する)。"""
+        self._image_copy_worker: ImageCopyWorker | None = None
+        """ImageCopyWorker | None: 実行中の画像コピーワーカー。コピー中でなければ None。"""
+
+        # --- リサイズ時の画像再スケーリングを間引くためのタイマー ---
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(PREVIEW_RESIZE_DEBOUNCE_MS)
+        self._resize_timer.timeout.connect(self._do_rescale_preview)
+
+        # --- ステータスラベルのメッセージを一定時間後に消すためのタイマー ---
+        self._status_clear_timer = QTimer(self)
+        self._status_clear_timer.setSingleShot(True)
+        self._status_clear_timer.timeout.connect(lambda: self.status_label.clear())
+        self._pending_saved_items: dict[tuple[str, str], None] = {}
+        """dict: dataSaved の発行を待っている (category, item_id)。挿入順を保つ集合として使う。"""
+        self._data_saved_emit_timer = QTimer(self)
+        """QTimer: 同じイベントループ内の保存完了をまとめて dataSaved を発行するためのタイマー。"""
+        self._data_saved_emit_timer.setSingleShot(True)
+        self._data_saved_emit_timer.setInterval(0)
+        self._data_saved_emit_timer.timeout.connect(self._flush_data_saved)
+        self._history_render_timer = QTimer(self)
+        """QTimer: アイテム読み込み後、他の項目の表示を待ってから履歴表示を描画するためのタイマー。"""
+        self._history_render_timer.setSingleShot(True)
+        self._history_render_timer.setInterval(0) # 次のイベントループで実行
+        self._history_render_timer.timeout.connect(self._refresh_history_view)
+        self._pending_history_deltas: list[dict] = []
+        """list[dict]: まだ追記ログに書き込んでいない履歴の編集・削除の操作 (発生順)。"""
+        self._history_delta_timer = QTimer(self)
+        """QTimer: 続けて行われた履歴の編集・削除を、1回のログ書き込みにまとめるためのタイマー。"""
+        self._history_delta_timer.setSingleShot(True)
+        self._history_delta_timer.setInterval(HISTORY_DELTA_FLUSH_DELAY_MS)
+        self._history_delta_timer.timeout.connect(self._write_pending_history_deltas)
+
+        # --- ★★★ 画像ボタンのメンバ変数 (init_ui で一度だけ生成) ★★★ ---
         self.img_buttons_layout: QHBoxLayout | None = None
         self.select_img_button: QPushButton | None = None
         self.clear_img_button: QPushButton | None = None
@@ -117,7 +413,11 @@ class DetailWindow(QWidget):
         self.init_ui()
 
     def init_ui(self):
-        """UI要素を初期化し、レイアウトを設定します。"""
+        """UI要素を初期化し、レイアウトを設定します。
+
+        詳細表示用のウィジェットはここで一度だけ生成し、アイテムの切り替え時には
+        _populate_detail_view で内容だけを差し替えます。
+        """
         main_layout = QVBoxLayout(self)
         main_layout.setSizeConstraint(QVBoxLayout.SetMinimumSize) # または QLayout.SetMinimumSize
 
@@ -133,9 +433,27 @@ class DetailWindow(QWidget):
         self.content_layout.setSizeConstraint(QVBoxLayout.SetMinimumSize) # または QLayout.SetMinimumSize
         scroll_area.setWidget(self.scroll_content_widget)
 
-        # --- 各詳細フィールドのプレースホルダー ---
-        # (load_dataが呼ばれるまで空か、ローディング表示)
-        self.content_layout.addWidget(QLabel("アイテムを選択すると詳細が表示されます。"))
+        # --- アイテム未選択時のプレースホルダー ---
+        self.placeholder_label = QLabel("アイテムを選択すると詳細が表示されます。")
+        self.content_layout.addWidget(self.placeholder_label)
+
+        # --- 詳細表示用ウィジェット (アイテム読み込み時に表示) ---
+        # 子ウィジェットを追加するたびに再描画・シグナル通知が起きないよう、生成中は止めておく
+        self.scroll_content_widget.setUpdatesEnabled(False)
+        self.scroll_content_widget.blockSignals(True)
+        try:
+            self.detail_container = QWidget()
+            self.detail_container.setVisible(False)
+            self._create_detail_widgets(self.detail_container)
+            self.content_layout.addWidget(self.detail_container)
+        finally:
+            self.scroll_content_widget.blockSignals(False)
+            self.scroll_content_widget.setUpdatesEnabled(True)
+
+        # --- ステータスラベル (履歴操作の結果などを一時的に表示) ---
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #555555;")
+        main_layout.addWidget(self.status_label)
 
         # --- 保存ボタン ---
         self.save_button = QPushButton("変更を保存")
@@ -143,174 +461,245 @@ class DetailWindow(QWidget):
         self.save_button.setEnabled(False) # 初期状態は無効 (データロード後に有効化)
         main_layout.addWidget(self.save_button)
 
+        # --- 書き出しボタン (保存済みの内容を読みやすいJSONファイルとして書き出す) ---
+        self.export_button = QPushButton("読みやすい形式で書き出し...")
+        self.export_button.clicked.connect(self.export_item_readable)
+        self.export_button.setEnabled(False) # 初期状態は無効 (データロード後に有効化)
+        main_layout.addWidget(self.export_button)
+
     def load_data(self, category: str, item_id: str):
         """指定されたカテゴリとIDのアイテムデータを読み込み、UIに表示します。
 
+        ウィンドウが非表示の場合は読み込みとUI構築を行わずに要求だけを記録し、
+        表示されたとき (showEvent) に最後に要求されたアイテムを1回だけ読み込みます。
+
         Args:
             category (str): 読み込むアイテムのカテゴリ名。
             item_id (str): 読み込むアイテムのID。
         """
-        print(f"DEBUG: load_data() called for category='{category}', item_id='{item_id}'")
-        self.clear_view() # 表示をクリア
-        
-        # --- ★★★ UIクリア後に確実に更新を反映 ★★★ ---
-        QApplication.processEvents()
-        self.repaint()  # ウィンドウの再描画を強制
-        # --- ★★★ --------------------------------- ★★★ ---
+        if not self.isVisible():
+            log.debug("load_data() deferred until shown: category='%s', item_id='%s'", category, item_id)
+            self._pending_load = (category, item_id)
+            return
+        self._pending_load = None
+        self._do_load_data(category, item_id)
+
+    def showEvent(self, event: 'QShowEvent'):
+        """ウィンドウ表示時に、非表示中に要求されたアイテムの読み込みを実行します。"""
+        super().showEvent(event)
+        if self._cached_message_box is None:
+            # スタイルの解決を含むメッセージボックスの初回生成を、最初の通知の前に済ませておく
+            QTimer.singleShot(0, self._message_box)
+        if self._pending_load is not None:
+            category, item_id = self._pending_load
+            self._pending_load = None
+            self._do_load_data(category, item_id)
+
+    def _message_box(self) -> QMessageBox:
+        """使い回し用のメッセージボックスを返します。初回呼び出し時にだけ生成します。"""
+        if self._cached_message_box is None:
+            self._cached_message_box = QMessageBox(self)
+            self._cached_message_box.ensurePolished()
+        return self._cached_message_box
+
+    def _show_message(self, icon: QMessageBox.Icon, title: str, text: str,
+                      buttons=QMessageBox.Ok, default_button=QMessageBox.NoButton) -> int:
+        """使い回しのメッセージボックスに内容を設定し、モーダルで表示します。
+
+        使い回しのメッセージボックスが表示中 (別の通知の表示中に呼ばれた場合) は、新しく生成して表示します。
+
+        Args:
+            icon (QMessageBox.Icon): 表示するアイコン。
+            title (str): ウィンドウタイトル。
+            text (str): 本文。
+            buttons (QMessageBox.StandardButtons, optional): 表示するボタン。デフォルトは OK のみ。
+            default_button (QMessageBox.StandardButton, optional): 既定のボタン。
+
+        Returns:
+            int: 押されたボタン (QMessageBox.StandardButton)。
+        """
+        message_box = self._message_box()
+        if message_box.isVisible():
+            message_box = QMessageBox(self)
+        message_box.setIcon(icon)
+        message_box.setWindowTitle(title)
+        message_box.setText(text)
+        message_box.setStandardButtons(buttons)
+        message_box.setDefaultButton(default_button)
+        return message_box.exec_()
+
+    def _info(self, title: str, text: str):
+        """情報メッセージを表示します (QMessageBox.information と同様)。"""
+        self._show_message(QMessageBox.Information, title, text)
+
+    def _warn(self, title: str, text: str):
+        """警告メッセージを表示します (QMessageBox.warning と同様)。"""
+        self._show_message(QMessageBox.Warning, title, text)
+
+    def _error(self, title: str, text: str):
+        """エラーメッセージを表示します (QMessageBox.critical と同様)。"""
+        self._show_message(QMessageBox.Critical, title, text)
+
+    def _confirm(self, title: str, text: str) -> bool:
+        """「はい」「いいえ」で確認し、「はい」が押されたかどうかを返します (既定は「いいえ」)。"""
+        return self._show_message(QMessageBox.Question, title, text,
+                                  QMessageBox.Yes | QMessageBox.No, QMessageBox.No) == QMessageBox.Yes
+
+    def _do_load_data(self, category: str, item_id: str):
+        """アイテムデータを実際に読み込み、UIに反映します。load_data() から呼び出されます。
+
+        Args:
+            category (str): 読み込むアイテムのカテゴリ名。
+            item_id (str): 読み込むアイテムのID。
+        """
+        log.debug("load_data() called for category='%s', item_id='%s'", category, item_id)
+        if not self.clear_view(allow_cancel=True): # 表示をクリア
+            log.debug("load_data() cancelled: unsaved history changes are kept for item_id='%s'", self.current_item_id)
+            return
 
         if not self.current_project_dir_name:
-            QMessageBox.critical(self, "プロジェクトエラー",
-                                 "プロジェクトが指定されていません。アイテム詳細を読み込めません。")
+            self._error("プロジェクトエラー",
+                        "プロジェクトが指定されていません。アイテム詳細を読み込めません。")
             self.setWindowTitle("詳細情報 (プロジェクトエラー)")
             return
 
-        print(f"DetailWindow: Loading data for Project='{self.current_project_dir_name}', Category='{category}', ID='{item_id}'")
+        log.debug("Loading data for Project='%s', Category='%s', ID='%s'", self.current_project_dir_name, category, item_id)
         item_data_loaded = get_item(self.current_project_dir_name, category, item_id)
 
         if not item_data_loaded:
-            QMessageBox.warning(self, "データ読み込みエラー",
-                                f"アイテム (ID: {item_id}, カテゴリ: {category}) のデータの読み込みに失敗しました。")
+            self._warn("データ読み込みエラー",
+                       f"アイテム (ID: {item_id}, カテゴリ: {category}) のデータの読み込みに失敗しました。")
             self.setWindowTitle(f"詳細情報 (読込エラー: {item_id})")
             return
 
         self.current_category = category
         self.current_item_id = item_id
         self.item_data = item_data_loaded.copy() # 変更を反映させるためにコピーを保持
-        print(f"DEBUG: DetailWindow.load_data - Loaded item_data: name='{self.item_data.get('name')}', description='{self.item_data.get('description')}'") # DEBUG
+        self._saved_image_path = self.item_data.get('image_path')
+        log.debug("load_data - Loaded item_data: name='%s', desc_len=%d",
+                  self.item_data.get('name'), len(self.item_data.get('description', '')))
 
         self.setWindowTitle(f"詳細: {self.item_data.get('name', 'N/A')} ({category})")
-        print("DEBUG: About to call _build_detail_view()")
-        self._build_detail_view() # データに基づいてUIを構築
-        print("DEBUG: _build_detail_view() completed in load_data()")
-        
-        # --- ★★★ UI構築後に確実に更新を反映 ★★★ ---
-        QApplication.processEvents()
-        self.repaint()  # ウィンドウの再描画を強制
-        # --- ★★★ --------------------------------- ★★★ ---
-        
+        self._populate_detail_view() # 生成済みのウィジェットにデータを反映
+        self._remember_loaded_tags()
+        self._set_fields_modified(False)
+        self._rebuild_recent_history_lines()
+
         self.save_button.setEnabled(True) # データロード成功で保存ボタンを有効化
+        self.export_button.setEnabled(True)
 
 
-    def clear_view(self):
-        """現在の詳細表示エリアの内容をクリアします。"""
-        # --- ★★★ 即座にウィジェットを削除して重複を防ぐ ★★★ ---
-        print(f"DEBUG: clear_view() called - content_layout has {self.content_layout.count()} items")
-        
-        # --- ★★★ より確実なクリア処理 ★★★ ---
-        # まず全てのウィジェットを隠す
-        for i in range(self.content_layout.count()):
-            item = self.content_layout.itemAt(i)
-            if item and item.widget():
-                item.widget().setVisible(False)
-                item.widget().setParent(None)
-        
-        # レイアウトを強制的にクリア
-        while self.content_layout.count() > 0:
-            item = self.content_layout.takeAt(0)
-            if item:
-                widget = item.widget()
-                if widget:
-                    print(f"DEBUG: Removing and hiding widget: {type(widget).__name__}")
-                    widget.setVisible(False)
-                    widget.setParent(None)
-                    widget.deleteLater()
-                else:
-                    print(f"DEBUG: Removing layout item")
-                    # レイアウトアイテムの場合、中身も確実にクリア
-                    layout = item.layout()
-                    if layout:
-                        while layout.count() > 0:
-                            sub_item = layout.takeAt(0)
-                            if sub_item and sub_item.widget():
-                                sub_item.widget().setVisible(False)
-                                sub_item.widget().setParent(None)
-                                sub_item.widget().deleteLater()
-        
-        print(f"DEBUG: After removal, content_layout has {self.content_layout.count()} items")
-        
-        # 即座にレイアウトを更新
-        self.content_layout.update()
-        self.scroll_content_widget.update()
-        self.update()
-        QApplication.processEvents()  # イベントループを処理して削除を確実に実行
-        
-        print(f"DEBUG: After processEvents, content_layout has {self.content_layout.count()} items")
-        # --- ★★★ ------------------------------------------ ★★★ ---
-        
-        self.detail_widgets.clear()
-        
-        # --- ★★★ 画像ボタンのメンバ変数もクリア ★★★ ---
-        if self.img_buttons_layout:
-            self.img_buttons_layout = None
-        if self.select_img_button:
-            self.select_img_button = None
-        if self.clear_img_button:
-            self.clear_img_button = None
-        # --- ★★★ ---------------------------- ★★★ ---
+    def clear_view(self, allow_cancel: bool = False) -> bool:
+        """現在の詳細表示エリアの内容をクリアします。
+        保存されていない履歴の変更があれば、クリアする前にまとめて保存します。
+
+        ウィジェット自体は破棄せず、内容を空にしてプレースホルダー表示に戻します。
+        履歴の保存に失敗した場合、allow_cancel が True であれば変更を破棄してよいかを確認し、
+        破棄しない場合はクリアせずに現在のアイテムを表示したままにします。
+
+        Args:
+            allow_cancel (bool, optional): 履歴の保存に失敗したときに、クリアの中止を選べるようにするかどうか。
+
+        Returns:
+            bool: クリアした場合は True、中止した場合は False。
+        """
+        if not self._flush_pending_history() and allow_cancel:
+            if not self._confirm("履歴保存エラー",
+                                 "履歴の変更を保存できませんでした。\n保存されていない変更を破棄して、表示を切り替えますか？"):
+                return False
+        # 保存できなかった履歴の変更は、次に表示するアイテムに持ち越さない
+        self._history_delta_timer.stop()
+        self._pending_history_deltas = []
+        self._history_dirty = False
+        self._history_render_timer.stop()
+        self._stop_preview_movie()
+        self._pending_decode_key = None # デコード中の結果は表示しない
+        self._original_image_pixmap = None
+        self._original_image_reduced = False
+        self._scaled_cache.clear()
+
+        # 各ウィジェットを個別に再描画させず、最後に1回だけ描画する
+        self.scroll_content_widget.setUpdatesEnabled(False)
+        try:
+            for field in EDITABLE_TEXT_FIELDS:
+                self.detail_widgets[field].clear()
+            # 履歴表示は残しておき、同じアイテムを開き直したときに再描画を省く (_refresh_history_view)
+            self.img_path_label.setText("<b>画像:</b> (選択されていません)")
+            self.img_preview_label.clear()
+            self.img_preview_label.setMinimumSize(200, 150)
+            self.img_preview_label.setMaximumSize(16777215, 16777215) # 前の画像の setFixedSize を解除
+            self.detail_container.setVisible(False)
+            self.placeholder_label.setVisible(True)
+        finally:
+            self.scroll_content_widget.setUpdatesEnabled(True)
         
         self.item_data = None
+        self._pending_load = None
+        self._recent_history_lines.clear()
+        self._image_path_dirty = False
         self.current_category = None
         self.current_item_id = None
         self.setWindowTitle("詳細情報 (アイテム未選択)")
         self.save_button.setEnabled(False)
+        self.export_button.setEnabled(False)
+        return True
 
 
-    def _build_detail_view(self):
-        """現在のアイテムデータに基づいてUI要素を動的に構築します。"""
-        if not self.item_data:
-            return
+    def _create_detail_widgets(self, container: QWidget):
+        """詳細表示用のウィジェットを生成して container に配置し、detail_widgets に登録します。
 
-        print(f"DEBUG: _build_detail_view() called - content_layout has {self.content_layout.count()} items")
-        
-        # --- ★★★ 重複クリア処理を削除（clear_viewで既に処理済み） ★★★ ---
-        # clear_viewで確実にクリアされているので、ここでの重複処理は不要
-        # --- ★★★ ------------------------------------------ ★★★ ---
+        init_ui から一度だけ呼び出されます。
+
+        Args:
+            container (QWidget): ウィジェットを配置するコンテナ。
+        """
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setAlignment(Qt.AlignTop)
 
         # 名前
-        name_label = QLabel("<b>名前:</b>"); name_edit = QLineEdit(self.item_data.get("name", "")); self.detail_widgets['name'] = name_edit; self.content_layout.addWidget(name_label); self.content_layout.addWidget(name_edit)
+        name_label = QLabel("<b>名前:</b>"); name_edit = QLineEdit(); self.detail_widgets['name'] = name_edit; layout.addWidget(name_label); layout.addWidget(name_edit)
 
         # 説明/メモ
         desc_label = QLabel("<b>説明/メモ:</b>")
-        desc_edit = QTextEdit() # まずインスタンスを作成
-        desc_edit.setPlainText(self.item_data.get("description", "")) # setPlainText で設定
+        desc_edit = QPlainTextEdit() # プレーンテキストのみ扱うので、軽量な QPlainTextEdit を使う
         desc_edit.setMinimumHeight(150)
         desc_edit.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.detail_widgets['description'] = desc_edit
-        self.content_layout.addWidget(desc_label)
-        self.content_layout.addWidget(desc_edit)
+        layout.addWidget(desc_label)
+        layout.addWidget(desc_edit)
 
-        ai_update_button = QPushButton("AIで「説明/メモ」を編集支援"); ai_update_button.clicked.connect(self._on_ai_update_description_clicked); self.content_layout.addWidget(ai_update_button)
+        ai_update_button = QPushButton("AIで「説明/メモ」を編集支援"); ai_update_button.clicked.connect(self._on_ai_update_description_clicked); layout.addWidget(ai_update_button)
 
         # 履歴
         history_label = QLabel("<b>履歴:</b>")
-        self.content_layout.addWidget(history_label) # ラベルを先に追加
+        layout.addWidget(history_label) # ラベルを先に追加
 
         history_view_container = QWidget() # 履歴表示とボタンをまとめるコンテナ
         history_view_layout = QVBoxLayout(history_view_container)
         history_view_layout.setContentsMargins(0,0,0,0)
 
-        self.history_view_text_edit = QTextEdit() # QTextEditはメンバ変数に
-        self.history_view_text_edit.setReadOnly(True)
-        history_entries = self.item_data.get("history", [])
-        history_display_html = ""
-        if not history_entries:
-            history_display_html = "履歴はありません。"
-        else:
-            for i, h_entry_dict in enumerate(history_entries):
-                entry_text_for_display = h_entry_dict.get('entry', '(内容なし)')
-                # タイムスタンプは表示しない、代わりに通し番号を表示
-                # formatted_entry_text = entry_text_for_display.replace("\n", "<br>") # 修正前コメントアウト
-                # 1. 半角スペースを &nbsp; に置換
-                temp_text = entry_text_for_display.replace(" ", "&nbsp;")
-                # 2. 改行を <br> に置換
-                formatted_entry_text = temp_text.replace("\n", "<br>") # ★★★ 修正箇所 ★★★
-                history_display_html += f"<b>({i + 1})</b> {formatted_entry_text}"
-                if i < len(history_entries) - 1: # 最後の要素以外には区切り線
-                    history_display_html += "<hr>" # 区切り線
-        self.history_view_text_edit.setHtml(history_display_html) # HTMLとしてセット
-        self.history_view_text_edit.setMinimumHeight(100) # 高さを調整
-        self.detail_widgets['history_view'] = self.history_view_text_edit # 保存対象外
-        history_view_layout.addWidget(self.history_view_text_edit)
+        # 履歴全体を1つのリッチテキストにせず、画面に表示される行だけを整形・レイアウトするリストビューで表示する
+        self.history_model = HistoryListModel(self)
+        self.history_list_view = QListView()
+        self.history_list_view.setModel(self.history_model)
+        self.history_list_view.setItemDelegate(HistoryItemDelegate(self.history_list_view))
+        self.history_list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.history_list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.history_list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.history_list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.history_list_view.setResizeMode(QListView.Adjust) # 幅が変わったら行の高さを計算し直す
+        self.history_list_view.setLayoutMode(QListView.Batched) # 長い履歴は少しずつレイアウトしてUIを止めない
+        self.history_list_view.setMinimumHeight(150) # 高さを調整
+        # 行の右クリックメニューとダブルクリックで、その行の履歴を直接編集・削除できるようにする
+        self.history_list_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.history_list_view.customContextMenuRequested.connect(self._on_history_context_menu)
+        self.history_list_view.doubleClicked.connect(lambda model_index: self._edit_history_at(model_index.row()))
+        self.detail_widgets['history_view'] = self.history_list_view # 保存対象外
+        history_view_layout.addWidget(self.history_list_view)
+        self.history_placeholder_label = QLabel("履歴はありません。") # 履歴がない・読み込み中の表示
+        self.history_placeholder_label.setVisible(False)
+        history_view_layout.addWidget(self.history_placeholder_label)
 
         history_buttons_layout = QHBoxLayout()
         add_history_button = QPushButton("AIで履歴エントリを生成・追加")
@@ -319,90 +708,260 @@ class DetailWindow(QWidget):
         history_buttons_layout.addWidget(add_history_button)
 
         edit_history_button = QPushButton("履歴を編集")
-        edit_history_button.setToolTip("指定した番号の履歴エントリを編集します。")
+        edit_history_button.setToolTip("選択中 (未選択の場合は先頭) の履歴エントリを編集します。履歴の右クリックでも編集できます。")
         edit_history_button.clicked.connect(self.edit_history_entry_ui) # 新しいメソッドに接続
         history_buttons_layout.addWidget(edit_history_button)
 
         delete_history_button = QPushButton("履歴を削除")
-        delete_history_button.setToolTip("指定した番号の履歴エントリを削除します。")
+        delete_history_button.setToolTip("選択中の履歴エントリを削除します。履歴の右クリックでも削除できます。")
         delete_history_button.clicked.connect(self.delete_history_entry_ui)
         history_buttons_layout.addWidget(delete_history_button)
         history_buttons_layout.addStretch()
         history_view_layout.addLayout(history_buttons_layout)
-        self.content_layout.addWidget(history_view_container)
+        layout.addWidget(history_view_container)
 
         # タグ (既存のアイテム自身のタグ)
-        tags_label = QLabel("<b>タグ</b> (カンマ区切り):")
-        tags_edit = QLineEdit(", ".join(self.item_data.get("tags", [])))
+        # タグはリストのまま受け渡すチップ入力で編集する (カンマ区切り文字列との変換を行わない)
+        tags_label = QLabel("<b>タグ</b> (Enter またはカンマで追加、クリックで削除):")
+        tags_edit = TagChipEdit()
         self.detail_widgets['tags'] = tags_edit
-        self.content_layout.addWidget(tags_label)
-        self.content_layout.addWidget(tags_edit)
+        layout.addWidget(tags_label)
+        layout.addWidget(tags_edit)
 
         # --- ★★★ 参照先タグ入力フィールドを追加 (アイテム用) ★★★ ---
-        ref_tags_label = QLabel("<b>参照先タグ</b> (カンマ区切り、プロンプト連携用):")
-        ref_tags_edit = QLineEdit(", ".join(self.item_data.get("reference_tags", []))) # 新しいキー
+        ref_tags_label = QLabel("<b>参照先タグ</b> (プロンプト連携用):")
+        ref_tags_edit = TagChipEdit() # 新しいキー
         ref_tags_edit.setPlaceholderText("例: ギルド職員, 魔法武器")
         self.detail_widgets['reference_tags'] = ref_tags_edit # detail_widgets に登録
-        self.content_layout.addWidget(ref_tags_label)
-        self.content_layout.addWidget(ref_tags_edit)
+        layout.addWidget(ref_tags_label)
+        layout.addWidget(ref_tags_edit)
         # --- ★★★ ------------------------------------------ ★★★ ---
 
         # 画像
-        print("DEBUG: Creating image section...")
         self.img_path_label = QLabel("<b>画像:</b> (選択されていません)")
         self.img_path_label.setWordWrap(True)
         self.detail_widgets['image_path_display'] = self.img_path_label
-        self.content_layout.addWidget(self.img_path_label)
+        layout.addWidget(self.img_path_label)
 
         self.img_preview_label = QLabel()
         self.img_preview_label.setAlignment(Qt.AlignCenter)
         self.img_preview_label.setMinimumSize(200, 150)
         self.img_preview_label.setFrameShape(QFrame.StyledPanel)
-        self.img_preview_label.setScaledContents(True)
+        # 画像は表示幅に合わせて自前でスケーリング (キャッシュ) するので、QLabelによる自動スケーリングは使わない
+        self.img_preview_label.setScaledContents(False)
         self.img_preview_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.detail_widgets['image_preview'] = self.img_preview_label
-        self._update_image_preview(self.item_data.get("image_path"))
-        self.content_layout.addWidget(self.img_preview_label)
-
-        print("DEBUG: Creating image buttons...")
-        # --- ★★★ 既存のボタンがある場合は削除 ★★★ ---
-        if self.img_buttons_layout is not None:
-            print("DEBUG: Removing existing image buttons layout")
-            self.content_layout.removeItem(self.img_buttons_layout)
-            if self.select_img_button:
-                self.select_img_button.deleteLater()
-            if self.clear_img_button:
-                self.clear_img_button.deleteLater()
-        # --- ★★★ ---------------------------- ★★★ ---
-        
+        layout.addWidget(self.img_preview_label)
+
         self.img_buttons_layout = QHBoxLayout()
         self.select_img_button = QPushButton("画像を選択")
-        print(f"DEBUG: Created select_img_button: {id(self.select_img_button)}")
         self.select_img_button.clicked.connect(self.select_image_file)
         self.img_buttons_layout.addWidget(self.select_img_button)
         self.clear_img_button = QPushButton("画像をクリア")
-        print(f"DEBUG: Created clear_img_button: {id(self.clear_img_button)}")
         self.clear_img_button.clicked.connect(self.clear_image_file)
         self.img_buttons_layout.addWidget(self.clear_img_button)
         self.img_buttons_layout.addStretch()
-        self.content_layout.addLayout(self.img_buttons_layout)
-        print(f"DEBUG: Added image buttons layout to content_layout. Total items: {self.content_layout.count()}")
-        
+        layout.addLayout(self.img_buttons_layout)
 
-        spacer = QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding); self.content_layout.addSpacerItem(spacer)
-        
-        print(f"DEBUG: _build_detail_view() completed - content_layout has {self.content_layout.count()} items")
+        spacer = QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding); layout.addSpacerItem(spacer)
+
+    def _populate_detail_view(self):
+        """現在のアイテムデータを、init_ui で生成済みのウィジェットに反映します。"""
+        if not self.item_data:
+            return
+
+        # 各ウィジェットへの反映中は再描画を止め、最後にまとめて1回だけ描画・レイアウトする
+        self.scroll_content_widget.setUpdatesEnabled(False)
+        try:
+            self.detail_widgets['name'].setText(self.item_data.get("name", ""))
+            self.detail_widgets['description'].setPlainText(self.item_data.get("description", "")) # setPlainText で設定
+            self.detail_widgets['tags'].setTokens(self.item_data.get("tags"))
+            self.detail_widgets['reference_tags'].setTokens(self.item_data.get("reference_tags"))
+            self._schedule_history_view_refresh()
+
+            self.placeholder_label.setVisible(False)
+            self.detail_container.setVisible(True)
+            # 画像の表示幅はウィンドウ幅から決まるため、コンテナを表示してから読み込む
+            self._update_image_preview(self.item_data.get("image_path"))
+        finally:
+            self.scroll_content_widget.setUpdatesEnabled(True)
+            self.scroll_content_widget.updateGeometry()
+
+    def _set_history_placeholder(self, text: str | None):
+        """履歴リストの代わりに表示するメッセージを設定します。
+
+        Args:
+            text (str | None): 表示するメッセージ。None の場合はメッセージを隠してリストを表示する。
+        """
+        if text:
+            self.history_placeholder_label.setText(text)
+        self.history_placeholder_label.setVisible(bool(text))
+        self.history_list_view.setVisible(not text)
+
+    def _append_history_view_entry(self, entry_dict: dict):
+        """item_data['history'] の末尾に追加済みのエントリを、履歴リストの末尾にだけ追加します。
+
+        既存の行の再整形は行いません。
+
+        Args:
+            entry_dict (dict): 追加された履歴エントリ辞書。
+        """
+        if self._history_render_timer.isActive():
+            return # 予約済みの描画で、追加されたエントリを含む履歴全体が表示される
+        history_entries = self.item_data.get("history", []) if self.item_data else []
+        if self.history_model.is_showing(history_entries):
+            self.history_model.entry_appended()
+        else:
+            self.history_model.set_entries(history_entries) # 履歴のリストが作り直されていた場合
+        self._set_history_placeholder(None)
+        self.history_list_view.scrollToBottom()
+
+    def _append_history_row(self, entry_dict: dict):
+        """保存済みの新しい履歴エントリを、メモリ上のアイテムデータと履歴表示に追加します。
+
+        item_data['history'] をその場で更新し、履歴表示には1行だけ追加します。
+        名前・説明・画像などの他のウィジェットや、読み込み済みの画像には触れません。
+
+        Args:
+            entry_dict (dict): 追加する履歴エントリ辞書 (create_history_entry で作成したもの)。
+        """
+        if not isinstance(self.item_data.get('history'), list):
+            self.item_data['history'] = [] # 履歴フィールドがなければリストで初期化
+        self.item_data['history'].append(entry_dict)
+        self._recent_history_lines.append(self._format_recent_history_line(entry_dict))
+        self._append_history_view_entry(entry_dict)
+
+    def _refresh_history_row(self, index: int):
+        """履歴エントリの編集後に、その行の表示だけを更新します。
+
+        Args:
+            index (int): 編集されたエントリのインデックス (0始まり)。
+        """
+        self.history_model.entry_replaced(index)
+
+    def _remove_history_row(self, index: int):
+        """履歴エントリの削除後に、その行を履歴リストから取り除きます。
+
+        Args:
+            index (int): 削除されたエントリのインデックス (0始まり)。
+        """
+        history_entries = self.item_data.get("history", [])
+        self.history_model.entry_removed(index)
+        if not history_entries:
+            self._set_history_placeholder("履歴はありません。")
+
+    def _schedule_history_view_refresh(self):
+        """履歴表示の描画を、名前や説明などの表示が済んだ後 (次のイベントループ) に行うよう予約します。
+
+        履歴が長いアイテムでも、ウィンドウの他の項目は履歴のHTML生成を待たずに表示されます。
+        """
+        item_key = (self.current_project_dir_name, self.current_category, self.current_item_id)
+        if item_key != self._last_history_item_key:
+            self.history_model.set_entries([]) # 前のアイテムの履歴を見せない
+            self._set_history_placeholder("履歴を読み込み中...")
+            self._last_history_item_key = None
+        self._history_render_timer.start()
+
+    def _refresh_history_view(self):
+        """メモリ上の item_data['history'] から履歴表示だけを更新します。"""
+        if not self.item_data or 'history_view' not in self.detail_widgets:
+            return
+        if not isinstance(self.item_data.get("history"), list):
+            self.item_data["history"] = [] # モデルと同じリストを共有するため、リストにしておく
+        history_entries = self.item_data["history"]
+        item_key = (self.current_project_dir_name, self.current_category, self.current_item_id)
+        if item_key == self._last_history_item_key and self.history_model.adopt_if_same(history_entries):
+            return # 開き直した同じアイテムの同じ履歴を表示済み (作成済みの行のHTMLを再利用する)
+        # 行の表示用HTMLは、ビューが各行を表示するときに初めて作成される
+        self.history_model.set_entries(history_entries)
+        self._set_history_placeholder(None if history_entries else "履歴はありません。")
+        self._last_history_item_key = item_key
+
+    @staticmethod
+    def _format_recent_history_line(entry_dict: dict) -> str:
+        """履歴エントリを、AI履歴生成の指示に含める1行に整形します。"""
+        return f"- {entry_dict.get('entry', '(内容なし)')}"
+
+    def _rebuild_recent_history_lines(self):
+        """item_data['history'] の末尾から、直近履歴行の deque を作り直します。
+
+        履歴の追加時は deque への append だけで済むため、これを呼ぶのは
+        ロード時と、編集・削除で既存エントリが変わった時のみです。
+        """
+        self._recent_history_lines.clear()
+        history_entries = self.item_data.get("history", []) if self.item_data else []
+        if isinstance(history_entries, list):
+            self._recent_history_lines.extend(
+                self._format_recent_history_line(h) for h in history_entries[-HISTORY_CONTEXT_MAX_ENTRIES:]
+            )
+
+    def _show_status_message(self, message: str, timeout_ms: int = STATUS_MESSAGE_TIMEOUT_MS):
+        """ウィンドウ下部のステータスラベルにメッセージを一時的に表示します。
+
+        モーダルな QMessageBox と違い、操作をブロックしません。
+
+        Args:
+            message (str): 表示するメッセージ。
+            timeout_ms (int, optional): メッセージを消すまでの時間 (ミリ秒)。
+        """
+        self.status_label.setText(message)
+        self._status_clear_timer.start(timeout_ms)
+
+    def _persist_history_delta(self, delta: dict):
+        """履歴エントリの編集・削除を、アイテムの追記ログに書き込む操作として予約します。
+
+        HISTORY_DELTA_FLUSH_DELAY_MS 以内に続けて行われた操作は、1回の書き込みにまとめます。
+        既に保留中の履歴変更がある場合や書き込みに失敗した場合は、
+        履歴全体を後で _flush_pending_history / save_details でまとめて保存します。
+
+        Args:
+            delta (dict): append_history_deltas に渡す操作。
+        """
+        if self._history_dirty:
+            return # 履歴全体の保存に含まれる
+        self._pending_history_deltas.append(delta)
+        self._history_delta_timer.start() # 操作が続く間は書き込みを先送りする
+
+    def _write_pending_history_deltas(self):
+        """予約されている履歴の操作を、アイテムの追記ログに1回でまとめて書き込みます。"""
+        self._history_delta_timer.stop()
+        if not self._pending_history_deltas:
+            return
+        deltas = self._pending_history_deltas
+        self._pending_history_deltas = []
+        if self._history_dirty or not self.item_data:
+            return # 履歴全体の保存に含まれる
+        self._wait_for_pending_save() # 同じファイルへの書き込みが重ならないようにする
+        if not append_history_deltas(self.current_project_dir_name, self.current_category, self.current_item_id, deltas):
+            self._history_dirty = True # メモリ上の履歴には反映済みなので、履歴全体の保存で書き込む
+
+    def _flush_pending_history(self) -> bool:
+        """予約中の履歴の編集・削除と、保存されていない履歴全体の変更を書き込みます。
+
+        履歴全体の変更 (追記ログへの書き込みに失敗した場合など) は、1回の update_item でまとめて保存します。
+
+        Returns:
+            bool: 保存が不要だった場合、または保存に成功した場合は True。失敗した場合は False。
+        """
+        self._write_pending_history_deltas() # 予約中の編集・削除を先に (発生順に) 書き込む
+        self._wait_for_pending_save() # 同じファイルへの書き込みが重ならないようにする
+        if not self._history_dirty:
+            return True
+        if not self.item_data or not self.current_category or not self.current_item_id or not self.current_project_dir_name:
+            self._history_dirty = False
+            return True
+        if update_item(self.current_project_dir_name, self.current_category, self.current_item_id, {"history": self.item_data.get('history', [])}):
+            self._history_dirty = False
+            return True
+        self._warn("履歴保存エラー", "履歴の変更内容の保存に失敗しました。")
+        return False
 
     def _on_ai_update_description_clicked(self):
         """「AIで説明/メモを編集」ボタンがクリックされたときの処理。"""
-        print(f"DEBUG: _on_ai_update_description_clicked - current_item_id: {self.current_item_id}") # DEBUG
-        if self.item_data: # DEBUG
-            print(f"DEBUG: _on_ai_update_description_clicked - item_data: name='{self.item_data.get('name')}', desc_len={len(self.item_data.get('description', ''))}") # DEBUG
-        else: # DEBUG
-            print("DEBUG: _on_ai_update_description_clicked - self.item_data is None") # DEBUG
+        log.debug("_on_ai_update_description_clicked - current_item_id: %s", self.current_item_id)
 
         if not self.item_data or not self.current_project_dir_name or not self.current_category:
-            QMessageBox.warning(self, "AI編集エラー", "アイテムデータがロードされていません。")
+            self._warn("AI編集エラー", "アイテムデータがロードされていません。")
             return
 
         # current_text を self.item_data から直接取得するように変更
@@ -410,49 +969,35 @@ class DetailWindow(QWidget):
         item_name = self.item_data.get("name", "不明なアイテム")
         # print(f"DEBUG: current_text for branching: '{current_text}'") # このデバッグは item_data ベースになる
 
-        # プロジェクト設定からAI編集支援プロンプトを取得
-        from core.config_manager import load_project_settings # 動的に読み込む
-        project_settings = load_project_settings(self.current_project_dir_name)
+        # プロジェクト設定からAI編集支援プロンプトを取得 (メインウィンドウが読み込み済みの設定があれば、ファイルを読み直さない)
+        project_settings = self._current_project_settings()
         if not project_settings:
-            QMessageBox.warning(self, "設定エラー", "プロジェクト設定を読み込めませんでした。")
+            self._warn("設定エラー", "プロジェクト設定を読み込めませんでした。")
             return
 
         ai_prompts = project_settings.get("ai_edit_prompts", DEFAULT_PROJECT_SETTINGS.get("ai_edit_prompts", {}))
         empty_template_full_text = project_settings.get("empty_description_template", DEFAULT_PROJECT_SETTINGS.get("empty_description_template", ""))
 
         if not current_text.strip(): # 説明が空の場合 (新規作成モード)
-            prompt_template_str = ai_prompts.get("description_new", "")
-            print(f"DEBUG: description_new template: {prompt_template_str}") # DEBUG
-            # カテゴリに応じた雛形テンプレートを取得
-            category_specific_empty_template = get_category_template(self.current_category, empty_template_full_text)
-            print(f"DEBUG: category_specific_empty_template for '{self.current_category}': {category_specific_empty_template}") # DEBUG
-            if not category_specific_empty_template:
-                 # カテゴリ別テンプレートがない場合、デフォルトの全体を使用
-                category_specific_empty_template = empty_template_full_text 
-            
-            # プレースホルダを実際の値で置換
-            # description_new の {empty_description_template} を category_specific_empty_template で置換
-            if "{empty_description_template}" in prompt_template_str:
-                prompt_template_str = prompt_template_str.replace("{empty_description_template}", category_specific_empty_template)
-            else: # description_new に雛形テンプレートのプレースホルダがない場合、直接雛形を使う (フォールバック)
-                print("警告: description_new プロンプトに {empty_description_template} プレースホルダがありません。empty_description_template を直接使用します。")
-                prompt_template_str = category_specific_empty_template # この場合、指示プロンプトなしで雛形のみになる
-            print(f"DEBUG: prompt_template_str after empty_template replacement: {prompt_template_str}") # DEBUG
-            
+            # カテゴリに応じた雛形テンプレートを埋め込む (設定とカテゴリが同じなら前回の結果を再利用)
+            prompt_template_str = _resolve_description_new_template(
+                ai_prompts.get("description_new", ""), empty_template_full_text, self.current_category
+            )
+            log.debug("description_new template (resolved) length: %d", len(prompt_template_str))
             final_prompt = prompt_template_str.replace("{item_name}", item_name) # item_name も置換
             instruction_text = f"「{item_name}」の「説明/メモ」を新規作成してください。" # ダイアログ用の指示
-            print(f"DEBUG: final_prompt (new): {final_prompt}") # DEBUG
+            log.debug("final_prompt (new) length: %d", len(final_prompt))
         else: # 既存の説明がある場合 (編集モード)
             prompt_template_str = ai_prompts.get("description_edit", "")
-            print(f"DEBUG: description_edit template: {prompt_template_str}") # DEBUG
+            log.debug("description_edit template length: %d", len(prompt_template_str))
             final_prompt = prompt_template_str.replace("{item_name}", item_name).replace("{current_text}", current_text)
             # instruction_text は編集モードの場合も final_prompt を使うべきか、あるいは現在のままでも良いか検討。
             # 現状はダイアログの instruction_edit に final_prompt が表示されるべきなので、instruction_text は final_prompt と同じにする。
             instruction_text = f"「{item_name}」の「説明/メモ」を編集してください。" # これはダイアログのタイトル等に使われる想定だったかもしれないが、初期テキストとしては final_prompt を使う。
-            print(f"DEBUG: final_prompt (edit): {final_prompt}") # DEBUG
+            log.debug("final_prompt (edit) length: %d", len(final_prompt))
 
         if not final_prompt.strip():
-            QMessageBox.warning(self, "プロンプトエラー", "AI編集用のプロンプトテンプレートが空です。設定を確認してください。")
+            self._warn("プロンプトエラー", "AI編集用のプロンプトテンプレートが空です。設定を確認してください。")
             return
 
         # AI編集ダイアログを表示
@@ -464,60 +1009,69 @@ class DetailWindow(QWidget):
             target_widget=self.detail_widgets.get('description'),
             mode='description' # モードを設定
         )
-        print(f"DEBUG: _on_ai_update_description_clicked - Just before calling _show_ai_edit_dialog, final_prompt length: {len(final_prompt)}") # DEBUG
 
-    def _show_ai_edit_dialog(self, instruction_text: str, system_prompt: str, user_prompt_template: str, target_widget: QTextEdit, mode: str):
+    def _show_ai_edit_dialog(self, instruction_text: str, system_prompt: str, user_prompt_template: str, target_widget: QPlainTextEdit, mode: str):
         """AI編集支援ダイアログを表示します。
 
         Args:
             instruction_text (str): AIに提示する指示プロンプト。
             system_prompt (str): AIに提示するシステムプロンプト。
             user_prompt_template (str): ユーザーが入力するテンプレート。
-            target_widget (QTextEdit): 編集対象のテキストウィジェット。
+            target_widget (QPlainTextEdit): 編集対象のテキストウィジェット。
             mode (str): AI編集ダイアログのモード ('description' または 'history')。
         """
-        print(f"DEBUG: _show_ai_edit_dialog - Received instruction_text length: {len(instruction_text)}") # DEBUG
+        log.debug("_show_ai_edit_dialog - Received instruction_text length: %d", len(instruction_text))
 
-        # 既存のダイアログインスタンスがあれば、安全に破棄する
-        if self.ai_edit_dialog:
-            try:
-                # シグナル接続が残っている可能性があるので、先に切断を試みる (必須ではないが多くの場合安全)
-                self.ai_edit_dialog.request_ai_button.clicked.disconnect()
-            except TypeError: # 未接続の場合 TypeError が発生する
-                pass
-            self.ai_edit_dialog.deleteLater() # deleteLater() で安全に破棄
-            self.ai_edit_dialog = None
-
-        # 毎回新しいダイアログインスタンスを作成する
-        current_description_for_dialog = self.item_data.get("description", "") if self.item_data else ""
-        self.ai_edit_dialog = AIAssistedEditDialog(
-            initial_instruction_text=instruction_text,
-            current_item_description=current_description_for_dialog,
-            parent=self,
-            window_title=f"AIで「{self.item_data.get('name', '不明なアイテム')}」を編集 ({mode})"
+        self.ai_edit_dialog = self._get_shared_ai_dialog(
+            instruction_text,
+            f"AIで「{self.item_data.get('name', '不明なアイテム')}」を編集 ({mode})"
         )
         self.ai_edit_dialog_mode = mode # モードを設定
-        
-        # AI提案リクエストボタンのシグナルを接続
-        # (インスタンスが毎回新しいので、毎回接続が必要)
-        self.ai_edit_dialog.request_ai_button.clicked.connect(
-            lambda: self._handle_ai_suggestion_request(
-                self.ai_edit_dialog.get_instruction_text()
-            )
-        )
 
         # ダイアログを表示し、結果を処理
         if self.ai_edit_dialog.exec_() == QDialog.Accepted:
             final_text = self.ai_edit_dialog.get_final_text()
             if target_widget: # target_widget が None でないことを確認
                 target_widget.setPlainText(final_text)
-            print("AIによる説明編集が適用されました。(保存は別途必要)")
+                # setPlainText は変更フラグを下ろすため、保存対象になるよう立て直す
+                target_widget.document().setModified(True)
+            log.info("AIによる説明編集が適用されました。(保存は別途必要)")
         
-        # exec_() が終了したら、ダイアログインスタンスを確実に破棄する
-        if self.ai_edit_dialog: # まだインスタンスへの参照が残っていれば
-            self.ai_edit_dialog.deleteLater()
+        # ダイアログ自体は次回も使い回すので破棄しない
         self.ai_edit_dialog = None
 
+    def _get_shared_ai_dialog(self, instruction_text: str, window_title: str) -> 'AIAssistedEditDialog':
+        """使い回し用のAI編集支援ダイアログを、指定の内容にリセットして返します。
+
+        初回呼び出し時にだけダイアログを生成し、「AIに提案を依頼する」ボタンを
+        _on_ai_dialog_request_clicked に接続します。
+
+        Args:
+            instruction_text (str): AIへの指示入力エリアに表示するテキスト。
+            window_title (str): ダイアログのウィンドウタイトル。
+
+        Returns:
+            AIAssistedEditDialog: リセット済みのダイアログ。
+        """
+        self._ai_request_serial += 1 # 以前に開いたダイアログでの依頼の応答は反映しない
+        if self._shared_ai_dialog is None:
+            from ui.ai_text_edit_dialog import AIAssistedEditDialog
+            self._shared_ai_dialog = AIAssistedEditDialog(
+                initial_instruction_text=instruction_text,
+                current_item_description="", # ダイアログ内では未使用
+                parent=self,
+                window_title=window_title
+            )
+            self._shared_ai_dialog.request_ai_button.clicked.connect(self._on_ai_dialog_request_clicked)
+        else:
+            self._shared_ai_dialog.reset(instruction_text, window_title)
+        return self._shared_ai_dialog
+
+    def _on_ai_dialog_request_clicked(self):
+        """AI編集支援ダイアログの「AIに提案を依頼する」ボタンが押されたときの処理。"""
+        if self.ai_edit_dialog:
+            self._handle_ai_suggestion_request(self.ai_edit_dialog.get_instruction_text())
+
     def _handle_ai_suggestion_request(self, instruction_text: str):
         """AIAssistedEditDialog からのAI提案リクエストを処理します。
 
@@ -525,6 +1079,7 @@ class DetailWindow(QWidget):
             instruction_text (str): AIAssistedEditDialog でユーザーが編集した指示プロンプト。
         """
         if not self.ai_edit_dialog: return
+        from core.gemini_handler import is_configured as gemini_is_configured
         if not gemini_is_configured():
             QMessageBox.warning(self.ai_edit_dialog, "APIキーエラー", "APIキーが未設定です。")
             return
@@ -532,7 +1087,7 @@ class DetailWindow(QWidget):
             QMessageBox.warning(self.ai_edit_dialog, "情報不足", "編集対象のアイテムデータが読み込まれていません。")
             return
 
-        main_window = get_main_window_instance()
+        main_window = self._main_window()
         if not main_window:
             QMessageBox.critical(self.ai_edit_dialog, "内部エラー", "メインウィンドウのインスタンスを取得できませんでした。")
             return
@@ -575,22 +1130,45 @@ class DetailWindow(QWidget):
         # --- -------------------- ---
 
         # --- 会話履歴の準備 ---
-        # MainWindow に get_current_chat_history() のようなメソッドがあると仮定
-        current_chat_history = main_window.get_current_chat_history()
         # MainWindow に current_history_range_for_prompt (スライダーの値) があると仮定
         max_history_pairs = getattr(main_window, 'current_history_range_for_prompt', None)
+        current_chat_history = self._get_chat_history_for_ai(main_window, max_history_pairs)
         # --- -------------- ---
 
         self.ai_edit_dialog.show_processing_message(True)
-        QApplication.processEvents()
 
-        response_text, error_message, usage_data = chat_handler.generate_response_with_history_and_context(
+        # --- API呼び出しはワーカースレッドで行い、完了後に _on_ai_suggestion_finished で結果を反映 ---
+        worker = AISuggestionWorker(
+            chat_handler, self._ai_request_serial,
             user_instruction=instruction_text,
             item_context=item_context_for_ai,
             chat_history_to_include=current_chat_history,
             max_history_pairs=max_history_pairs,
             override_model_name=target_model_name # ★ 決定したモデル名を渡す
         )
+        worker.suggestion_finished.connect(
+            lambda response_text, error_message, w=worker: self._on_ai_suggestion_finished(w, response_text, error_message))
+        self._ai_workers.append(worker)
+        worker.start()
+
+    def _on_ai_suggestion_finished(self, worker: AISuggestionWorker,
+                                   response_text: str | None, error_message: str | None):
+        """AI応答取得ワーカーの完了時に呼び出され、応答をAI編集支援ダイアログに反映します。
+
+        依頼後にダイアログが閉じられたり、別の用途で開き直されたりしていた場合は応答を破棄します。
+
+        Args:
+            worker (AISuggestionWorker): 完了したワーカー。
+            response_text (str | None): AIの応答テキスト。
+            error_message (str | None): エラーが発生した場合のメッセージ。
+        """
+        if worker in self._ai_workers:
+            self._ai_workers.remove(worker)
+        worker.wait() # run() の終了を待ってから破棄する
+        worker.deleteLater()
+        if not self.ai_edit_dialog or worker.request_serial != self._ai_request_serial:
+            log.debug("Discarding AI suggestion for a dialog that is no longer open.")
+            return
 
         self.ai_edit_dialog.show_processing_message(False)
 
@@ -603,13 +1181,64 @@ class DetailWindow(QWidget):
             QMessageBox.warning(self.ai_edit_dialog, "AI応答なし", "AIから有効な応答が得られませんでした。(詳細不明)")
             self.ai_edit_dialog.set_suggestion_text("")
 
+    def _current_project_settings(self) -> dict | None:
+        """表示中のアイテムが属するプロジェクトの設定を返します。
+
+        メインウィンドウが同じプロジェクトの設定を読み込み済みであればそれを使い、
+        そうでなければ設定ファイルから読み込みます。
+
+        Returns:
+            dict | None: プロジェクト設定。読み込めなかった場合は None。
+        """
+        main_window = self._main_window()
+        if (main_window and getattr(main_window, 'current_project_dir_name', None) == self.current_project_dir_name
+                and getattr(main_window, 'current_project_settings', None)):
+            return main_window.current_project_settings
+        return load_project_settings(self.current_project_dir_name)
+
+    def _main_window(self):
+        """メインウィンドウのインスタンスを返します。初回に解決した結果を以降も使い回します。
+
+        Returns:
+            MainWindow | None: メインウィンドウ。まだ登録されていなければ None (この場合はキャッシュしない)。
+        """
+        if self._main_window_cached is None:
+            self._main_window_cached = get_main_window_instance()
+        return self._main_window_cached
+
+    def _get_chat_history_for_ai(self, main_window, max_history_pairs: int | None) -> list:
+        """AI編集支援に渡す会話履歴を、MainWindow の履歴リビジョンをキーにキャッシュして返します。
+
+        会話履歴が変更されていない間は、履歴のコピーと切り詰めを繰り返さずに前回の結果を再利用します。
+
+        Args:
+            main_window: MainWindow のインスタンス。
+            max_history_pairs (int | None): 含める会話履歴の最大ペア数。None なら全て。
+
+        Returns:
+            list: 最大ペア数で切り詰め済みの会話履歴。
+        """
+        revision = getattr(main_window, 'chat_history_revision', None)
+        if revision is not None and self._chat_hist_cache is not None:
+            cached_revision, cached_max_pairs, cached_history = self._chat_hist_cache
+            if cached_revision == revision and cached_max_pairs == max_history_pairs:
+                return cached_history
+
+        history = main_window.get_current_chat_history()
+        if max_history_pairs is not None and max_history_pairs >= 0:
+            history = history[-(max_history_pairs * 2):] # ハンドラ側と同じ切り詰め方
+
+        if revision is not None:
+            self._chat_hist_cache = (revision, max_history_pairs, history)
+        return history
+
     def select_image_file(self):
         """「画像を選択」ボタンがクリックされたときの処理。
         ファイルダイアログを開き、選択された画像をプロジェクトのimagesフォルダにコピーし、
         アイテムデータには相対パスを保存します。
         """
         if not self.item_data or not self.current_project_dir_name:
-            QMessageBox.warning(self, "エラー", "画像を設定するアイテムまたはプロジェクトが選択されていません。")
+            self._warn("エラー", "画像を設定するアイテムまたはプロジェクトが選択されていません。")
             return
 
         source_file_path, _ = QFileDialog.getOpenFileName(
@@ -619,49 +1248,68 @@ class DetailWindow(QWidget):
 
         if source_file_path:
             # 1. プロジェクトの画像用ディレクトリパスを取得し、なければ作成
-            #    core.data_manager から ensure_project_images_dir_exists をインポートしておくこと
-            from core.data_manager import ensure_project_images_dir_exists, IMAGES_SUBDIR_NAME
-            
             project_images_dir_abs_path = ensure_project_images_dir_exists(self.current_project_dir_name)
             if not project_images_dir_abs_path:
-                QMessageBox.critical(self, "エラー", "プロジェクトの画像保存用ディレクトリの作成に失敗しました。")
+                self._error("エラー", "プロジェクトの画像保存用ディレクトリの作成に失敗しました。")
                 return
 
             # 2. コピー先のファイルパスを決定 (ファイル名はそのまま)
             file_name_only = os.path.basename(source_file_path)
             destination_file_abs_path = os.path.join(project_images_dir_abs_path, file_name_only)
 
-            # 3. ファイルをコピー (shutil をインポートしておくこと)
-            #    既に同名ファイルが存在する場合の処理も考慮 (上書き確認など)
-            #    今回はシンプルに上書きする
-            import shutil
-            try:
-                # 同じファイルならコピーしない (移動やリネームの場合を考慮)
-                if not os.path.exists(destination_file_abs_path) or not os.path.samefile(source_file_path, destination_file_abs_path):
-                    shutil.copy2(source_file_path, destination_file_abs_path) # copy2はメタデータもコピー
-                    print(f"Image copied from '{source_file_path}' to '{destination_file_abs_path}'")
-                else:
-                    print(f"Image '{file_name_only}' already exists in project and is the same file. No copy needed.")
-            except Exception as e:
-                QMessageBox.critical(self, "コピーエラー", f"画像のプロジェクトフォルダへのコピーに失敗しました:\n{e}")
-                return
-
-            # 4. アイテムデータに相対パスを保存
-            #    相対パスは images/ファイル名 の形式
+            # 相対パスは images/ファイル名 の形式
             relative_image_path = os.path.join(IMAGES_SUBDIR_NAME, file_name_only).replace("\\", "/") # OSパス区切りをスラッシュに統一
-            self.item_data['image_path'] = relative_image_path
-            print(f"  Saved relative image path: {relative_image_path}")
 
-            # 5. プレビューを更新
-            from PyQt5.QtCore import QTimer # QTimer をインポート
-            # self._update_image_preview(relative_image_path) # 直接呼び出すのをやめる
-            QTimer.singleShot(0, lambda path=relative_image_path: self._update_image_preview(path))
-            print(f"  Scheduled delayed image preview update for: {relative_image_path}")
+            # 3. ファイルをコピー (大きな画像でもUIが止まらないようワーカースレッドで行う)
+            #    既に同名ファイルが存在する場合はシンプルに上書きする
+            #    完了後、_on_image_copied でアイテムデータとプレビューを更新する
+            worker = ImageCopyWorker(source_file_path, destination_file_abs_path, relative_image_path,
+                                     self.current_category, self.current_item_id)
+            worker.copy_finished.connect(lambda error_message, w=worker: self._on_image_copied(w, error_message))
+            self._image_copy_worker = worker
+            self.select_img_button.setEnabled(False)
+            self.clear_img_button.setEnabled(False)
+            self.img_path_label.setText(f"<b>画像:</b> {relative_image_path} (コピー中...)")
+            worker.start()
+
+    def _on_image_copied(self, worker: ImageCopyWorker, error_message: str):
+        """画像コピーワーカーの完了時に呼び出され、アイテムの画像パスとプレビューを更新します。
+
+        Args:
+            worker (ImageCopyWorker): 完了したワーカー。
+            error_message (str): エラーメッセージ。成功時は空文字列。
+        """
+        if self._image_copy_worker is worker:
+            self._image_copy_worker = None
+        worker.wait() # run() の終了を待ってから破棄する
+        worker.deleteLater()
+        self.select_img_button.setEnabled(True)
+        self.clear_img_button.setEnabled(True)
+
+        is_current_item = (self.item_data is not None
+                           and worker.category == self.current_category
+                           and worker.item_id == self.current_item_id)
+        if error_message:
+            self._error("コピーエラー", f"画像のプロジェクトフォルダへのコピーに失敗しました:\n{error_message}")
+            if is_current_item:
+                self._update_image_preview(self.item_data.get('image_path')) # 表示を元に戻す
+            return
+        if not is_current_item:
+            return # コピー中に別のアイテムへ切り替えられた
+
+        # 4. アイテムデータに相対パスを保存
+        self.item_data['image_path'] = worker.relative_image_path
+        self._image_path_dirty = worker.relative_image_path != self._saved_image_path
+        log.debug("Saved relative image path: %s", worker.relative_image_path)
+
+        # 5. プレビューを更新
+        self._update_image_preview(worker.relative_image_path)
 
     def clear_image_file(self):
         """「画像をクリア」ボタンがクリックされたときの処理。画像パスをクリアします。"""
         if not self.item_data: return
         self.item_data['image_path'] = None
+        self._image_path_dirty = self._saved_image_path is not None # 元々画像がなければ保存は不要
         self._update_image_preview(None)
 
     def _update_image_preview(self, relative_image_path: str | None):
@@ -675,47 +1323,329 @@ class DetailWindow(QWidget):
             return
 
         if relative_image_path and self.current_project_dir_name:
-            # PROJECTS_BASE_DIR は config_manager から取得するか、DetailWindow が知る必要がある
-            # ここでは仮に core.data_manager にそのような定数があるとする
-            from core.data_manager import PROJECTS_BASE_DIR # 仮のインポート
             absolute_image_path = os.path.join(PROJECTS_BASE_DIR, self.current_project_dir_name, relative_image_path)
             
             if os.path.exists(absolute_image_path):
-                pixmap = QPixmap(absolute_image_path)
-                if not pixmap.isNull():
-                    # --- ★★★ アスペクト比を維持してスケーリング ★★★ ---
-                    # QLabel の現在のサイズに合わせてスケーリング
-                    # setScaledContents(True) は使わないか、False にする
-                    self.img_preview_label.setScaledContents(False) # QLabelによる自動スケーリングを無効化 [22]
-                    
-                    # --- ★★★ ウィンドウの実際の幅に合わせて画像をスケーリング ★★★ ---
-                    # DetailWindowの幅から適切な画像表示幅を計算
-                    window_width = self.width() if self.width() > 100 else 500  # 最小幅を保証
-                    # パディングやマージンを考慮して、ウィンドウ幅より少し小さくする
-                    available_width = max(300, window_width - 80)  # 80px分のマージンを確保
-                    
-                    # アスペクト比を保ってスケーリング
-                    scaled_pixmap = pixmap.scaledToWidth(available_width, Qt.SmoothTransformation)
-                    self.img_preview_label.setPixmap(scaled_pixmap)
-                    
-                    # ラベルのサイズポリシーをコンテンツに合わせて調整
-                    self.img_preview_label.setFixedSize(scaled_pixmap.size())
-                    # --- ★★★ ------------------------------------------ ★★★ ---
-
+                self._stop_preview_movie()
+                self._pending_decode_key = None
+                self._original_image_pixmap = None
+                self._original_image_reduced = False
+                self._scaled_cache.clear()
+                # --- ★★★ ウィンドウの実際の幅に合わせて画像をスケーリング ★★★ ---
+                available_width = self._preview_target_width()
+
+                reader = QImageReader(absolute_image_path)
+                image_format = bytes(reader.format()).lower()
+                source_size = reader.size()
+
+                if image_format == b'gif' and source_size.isValid() and source_size.width() > 0:
+                    # GIFはQMovieで再生し、縮小済みのフレームのみをラベルに渡す
+                    expected_height = _height_for_width(source_size, available_width)
+                    movie = QMovie(absolute_image_path)
+                    movie.setScaledSize(QSize(available_width, expected_height))
+                    self._preview_movie = movie
+                    self.img_preview_label.setMovie(movie)
+                    self.img_preview_label.setFixedSize(available_width, expected_height)
+                    movie.start()
                     self.img_path_label.setText(f"<b>画像:</b> {relative_image_path}")
                     return # 正常に表示
-                else:
-                    self.img_path_label.setText("<b>画像:</b> (読み込みエラー)")
+
+                # EXIF の回転情報に従って表示する (90度回転を含む場合は表示上の幅と高さが入れ替わる)
+                reader.setAutoTransform(True)
+                is_rotated = bool(reader.transformation() & QImageIOHandler.TransformationRotate90)
+                display_size = source_size.transposed() if is_rotated else source_size
+
+                # 大きな画像はデコード時に表示サイズ (HiDPIでは物理ピクセル幅) まで縮小し、フル解像度の展開を避ける
+                pixel_width = self._preview_target_pixel_width()
+                decode_width_key = "full"
+                is_large_image = False
+                if display_size.isValid() and display_size.width() > 0:
+                    is_large_image = (os.path.getsize(absolute_image_path) > LARGE_IMAGE_FILE_SIZE_BYTES
+                                      or display_size.width() * display_size.height() > LARGE_IMAGE_PIXEL_COUNT)
+                    if is_large_image and display_size.width() > pixel_width:
+                        expected_height = _height_for_width(display_size, pixel_width)
+                        # setScaledSize は回転前の画像に適用されるため、回転する場合は縦横を入れ替えて指定する
+                        decode_size = QSize(pixel_width, expected_height)
+                        reader.setScaledSize(decode_size.transposed() if is_rotated else decode_size)
+                        self._original_image_reduced = True
+                        decode_width_key = str(pixel_width)
+
+                # デコード済みの画像はアプリ全体の QPixmapCache で共有し、
+                # 同じアイテムを開き直したときなどに再デコードしない
+                # (ファイルの更新時刻をキーに含め、画像が差し替えられたら別エントリにする)
+                cache_key = f"detail_preview:{os.path.abspath(absolute_image_path)}:{os.path.getmtime(absolute_image_path)}:{decode_width_key}"
+                pixmap = QPixmapCache.find(cache_key)
+                if pixmap is None or pixmap.isNull():
+                    # キャッシュにない画像のデコードとスケーリングはワーカースレッドで行い、UIを止めない
+                    # (完了後に _on_preview_image_decoded で表示する)
+                    scaled_size = reader.scaledSize() if self._original_image_reduced else None
+                    self._start_image_decode(absolute_image_path, cache_key, scaled_size,
+                                             relative_image_path, show_loading=is_large_image)
+                    return
+                self._show_preview_pixmap(pixmap, relative_image_path)
+                return # 正常に表示
             else:
                 self.img_path_label.setText("<b>画像:</b> (ファイルが見つかりません)")
         else:
             self.img_path_label.setText("<b>画像:</b> (選択されていません)")
         
+        self._stop_preview_movie()
+        self._pending_decode_key = None
+        self._original_image_pixmap = None
+        self._scaled_cache.clear()
         self.img_preview_label.clear() # 画像がない場合やエラー時はクリア
-        # 画像がない場合はラベルサイズをリセット
+        # 画像がない場合はラベルサイズをリセット (前の画像の setFixedSize による最大サイズも解除)
         self.img_preview_label.setMinimumSize(200, 150)
+        self.img_preview_label.setMaximumSize(16777215, 16777215) # QWIDGETSIZE_MAX
         self.img_preview_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
+    def _show_preview_pixmap(self, pixmap: QPixmap, relative_image_path: str,
+                             prescaled_pixmap: QPixmap | None = None):
+        """デコード済みのオリジナル画像を保持し、現在の表示幅にスケーリングしてプレビュー表示します。
+
+        Args:
+            pixmap (QPixmap): デコード済みのオリジナル (またはデコード時に縮小済み) の画像。
+            relative_image_path (str): 表示用の相対画像パス。
+            prescaled_pixmap (QPixmap | None, optional): ワーカースレッドで高品質スケーリング済みの画像。
+                現在の表示幅と一致すれば、GUIスレッドでのスケーリングを省略して使用します。
+        """
+        self._original_image_pixmap = pixmap # リサイズ時の再スケーリング用に保持
+        pixel_width = self._preview_target_pixel_width()
+        # --- ★★★ アスペクト比を維持してスケーリング ★★★ ---
+        # QLabel の現在のサイズに合わせてスケーリング
+        # (QLabelによる自動スケーリングはウィジェット生成時に無効化済み)
+        # アスペクト比を保ってスケーリング (デコード時に縮小済みならそのまま使う)
+        if prescaled_pixmap is not None and not prescaled_pixmap.isNull() and prescaled_pixmap.width() == pixel_width:
+            scaled_pixmap = self._with_preview_pixel_ratio(prescaled_pixmap)
+        else:
+            scaled_pixmap = self._scale_preview(pixmap, pixel_width, Qt.SmoothTransformation)
+        self._store_scaled_preview(scaled_pixmap)
+        self._set_preview_pixmap(scaled_pixmap)
+        # --- ★★★ ------------------------------------------ ★★★ ---
+
+        self.img_path_label.setText(f"<b>画像:</b> {relative_image_path}")
+
+    def _start_image_decode(self, absolute_image_path: str, cache_key: str,
+                            scaled_size: QSize | None, relative_image_path: str,
+                            show_loading: bool = False):
+        """画像のデコードをワーカースレッドで開始します。
+
+        Args:
+            absolute_image_path (str): 画像ファイルの絶対パス。
+            cache_key (str): QPixmapCache に登録する際のキー。結果の照合にも使う。
+            scaled_size (QSize | None): デコード時に縮小するサイズ。None なら原寸。
+            relative_image_path (str): 表示用の相対画像パス。
+            show_loading (bool, optional): 完了まで「読み込み中」と表示するかどうか。
+                すぐに終わる小さな画像では表示がちらつかないよう False にします。
+        """
+        self._pending_decode_key = cache_key
+        self.img_preview_label.clear()
+        if show_loading:
+            self.img_preview_label.setText("画像を読み込み中...")
+            self.img_path_label.setText(f"<b>画像:</b> {relative_image_path} (読み込み中...)")
+        worker = ImageDecodeWorker(absolute_image_path, cache_key, self._preview_target_pixel_width(),
+                                   scaled_size, relative_image_path)
+        worker.image_decoded.connect(
+            lambda key, image, preview_image, w=worker: self._on_preview_image_decoded(w, key, image, preview_image))
+        self._image_decode_workers.append(worker)
+        worker.start()
+
+    def _on_preview_image_decoded(self, worker: ImageDecodeWorker, cache_key: str,
+                                  image: QImage, preview_image: QImage):
+        """画像デコードワーカーの完了時に呼び出され、GUIスレッドで QPixmap に変換して表示します。
+
+        デコード中に別の画像やアイテムへ切り替えられていた場合は、キャッシュへの登録のみ行います。
+
+        Args:
+            worker (ImageDecodeWorker): 完了したワーカー。
+            cache_key (str): デコードした画像のキャッシュキー。
+            image (QImage): デコード結果。失敗した場合は null。
+            preview_image (QImage): ワーカーで表示幅に高品質スケーリングした画像。
+        """
+        if worker in self._image_decode_workers:
+            self._image_decode_workers.remove(worker)
+        worker.wait() # run() の終了を待ってから破棄する
+        worker.deleteLater()
+
+        pixmap = QPixmap.fromImage(image, Qt.AutoColor | Qt.NoFormatConversion) if not image.isNull() else QPixmap()
+        if not pixmap.isNull():
+            QPixmapCache.insert(cache_key, pixmap)
+        if cache_key != self._pending_decode_key:
+            return # 既に別の画像の表示に切り替わっている
+        self._pending_decode_key = None
+        if pixmap.isNull():
+            self.img_preview_label.clear()
+            self.img_path_label.setText("<b>画像:</b> (読み込みエラー)")
+            return
+        if preview_image.cacheKey() == image.cacheKey():
+            prescaled_pixmap = pixmap # スケーリング不要だった場合は同じ画像
+        else:
+            prescaled_pixmap = QPixmap.fromImage(preview_image, Qt.AutoColor | Qt.NoFormatConversion)
+        self._show_preview_pixmap(pixmap, worker.relative_image_path, prescaled_pixmap)
+
+    def _wait_for_image_decodes(self):
+        """実行中の画像デコードワーカーがあれば、すべて終了するまで待機します。"""
+        for worker in list(self._image_decode_workers):
+            worker.wait()
+
+    def _preview_target_width(self) -> int:
+        """DetailWindowの幅から画像プレビューの表示幅を算出します。
+
+        Returns:
+            int: パディングやマージンを差し引いたプレビューの表示幅 (最小300px)。
+        """
+        window_width = self.width() if self.width() > 100 else 500  # 最小幅を保証
+        # パディングやマージンを考慮して、ウィンドウ幅より少し小さくする
+        return max(300, window_width - 80)  # 80px分のマージンを確保
+
+    def _preview_target_pixel_width(self) -> int:
+        """画像プレビューの表示幅を、画面のデバイスピクセル比を掛けた物理ピクセル数で返します。
+
+        HiDPI画面でもぼやけないよう、プレビュー用のピクスマップはこの幅でスケーリングします。
+
+        Returns:
+            int: プレビューの物理ピクセル幅。
+        """
+        return max(1, round(self._preview_target_width() * self.devicePixelRatioF()))
+
+    def _with_preview_pixel_ratio(self, pixmap: QPixmap) -> QPixmap:
+        """ピクスマップに現在のデバイスピクセル比を設定して返します。
+
+        Args:
+            pixmap (QPixmap): 物理ピクセル幅でスケーリング済みのピクスマップ。
+
+        Returns:
+            QPixmap: デバイスピクセル比を設定したピクスマップ。
+        """
+        device_pixel_ratio = self.devicePixelRatioF()
+        if pixmap.devicePixelRatio() != device_pixel_ratio:
+            pixmap = QPixmap(pixmap) # 共有元 (QPixmapCache 内のものなど) は変更しない
+            pixmap.setDevicePixelRatio(device_pixel_ratio)
+        return pixmap
+
+    def _scale_preview(self, pixmap: QPixmap, pixel_width: int, mode: Qt.TransformationMode) -> QPixmap:
+        """ピクスマップを指定の物理ピクセル幅にスケーリングし、デバイスピクセル比を設定して返します。
+
+        Args:
+            pixmap (QPixmap): スケーリング元のピクスマップ。
+            pixel_width (int): 物理ピクセル幅。
+            mode (Qt.TransformationMode): Qt.SmoothTransformation または Qt.FastTransformation。
+
+        Returns:
+            QPixmap: スケーリング済みのピクスマップ。幅が一致していればスケーリングは省略します。
+        """
+        if pixmap.width() != pixel_width:
+            pixmap = pixmap.scaledToWidth(pixel_width, mode)
+        return self._with_preview_pixel_ratio(pixmap)
+
+    def _set_preview_pixmap(self, pixmap: QPixmap):
+        """プレビューラベルにピクスマップを設定し、ラベルのサイズを論理ピクセルでの表示サイズに合わせます。
+
+        Args:
+            pixmap (QPixmap): デバイスピクセル比を設定済みのピクスマップ。
+        """
+        self.img_preview_label.setPixmap(pixmap)
+        device_pixel_ratio = pixmap.devicePixelRatio() or 1.0
+        # ラベルのサイズポリシーをコンテンツに合わせて調整
+        self.img_preview_label.setFixedSize(max(1, round(pixmap.width() / device_pixel_ratio)),
+                                            max(1, round(pixmap.height() / device_pixel_ratio)))
+
+    def _do_rescale_preview(self):
+        """リサイズが落ち着いた後に、保持しているオリジナル画像からプレビューを再スケーリングします。
+
+        オリジナル画像を保持していない場合 (GIFなど) や、デコード時に縮小した画像を
+        拡大する必要がある場合は、ファイルから読み込み直します。
+        """
+        if not self.item_data or not hasattr(self, 'img_preview_label') or not self.img_preview_label:
+            return
+        current_image_path = self.item_data.get("image_path")
+        if not current_image_path:
+            return
+
+        if self._pending_decode_key is not None:
+            return # デコード完了時に、その時点の表示幅でスケーリングされる
+
+        target_width = self._preview_target_pixel_width()
+        pixmap = self._original_image_pixmap
+        if pixmap is None or pixmap.isNull() or (self._original_image_reduced and target_width > pixmap.width()):
+            log.debug("Reloading image preview for %s", current_image_path)
+            self._update_image_preview(current_image_path)
+            return
+
+        if self._is_smooth_preview_displayed(target_width):
+            return # 既に高品質スケーリング済みの画像を表示中
+
+        # 以前に高品質スケーリングした幅であればキャッシュを使い、再計算しない
+        scaled_pixmap = self._get_cached_scaled_preview(target_width)
+        if scaled_pixmap is None:
+            scaled_pixmap = self._scale_preview(pixmap, target_width, Qt.SmoothTransformation)
+            self._store_scaled_preview(scaled_pixmap)
+        self._set_preview_pixmap(scaled_pixmap)
+
+    def _get_cached_scaled_preview(self, target_width: int) -> QPixmap | None:
+        """指定幅のスケーリング済みプレビューをキャッシュから取得します。
+
+        Args:
+            target_width (int): プレビューの物理ピクセル幅。
+
+        Returns:
+            QPixmap | None: キャッシュにあればそのピクスマップ、なければ None。
+        """
+        scaled_pixmap = self._scaled_cache.get(target_width)
+        if scaled_pixmap is not None:
+            self._scaled_cache.move_to_end(target_width)
+        return scaled_pixmap
+
+    def _store_scaled_preview(self, scaled_pixmap: QPixmap):
+        """スケーリング済みプレビューを表示幅をキーにキャッシュし、上限を超えたら古いものから破棄します。
+
+        Args:
+            scaled_pixmap (QPixmap): SmoothTransformation でスケーリングしたピクスマップ。
+        """
+        self._scaled_cache[scaled_pixmap.width()] = scaled_pixmap
+        self._scaled_cache.move_to_end(scaled_pixmap.width())
+        while len(self._scaled_cache) > SCALED_PREVIEW_CACHE_SIZE:
+            self._scaled_cache.popitem(last=False)
+
+    def _is_smooth_preview_displayed(self, target_width: int) -> bool:
+        """指定幅の高品質スケーリング済みプレビューが、既にラベルに表示されているかどうかを返します。
+
+        Args:
+            target_width (int): プレビューの物理ピクセル幅。
+
+        Returns:
+            bool: 表示中のピクスマップがキャッシュ済みの同じ幅のものであれば True。
+        """
+        smooth_pixmap = self._scaled_cache.get(target_width)
+        current_pixmap = self.img_preview_label.pixmap()
+        return (smooth_pixmap is not None and current_pixmap is not None
+                and current_pixmap.cacheKey() == smooth_pixmap.cacheKey())
+
+    def _apply_fast_preview_scale(self):
+        """リサイズ中の暫定表示として、オリジナル画像を FastTransformation で即座にスケーリングします。
+
+        高品質な再スケーリングは、リサイズが落ち着いた後に _do_rescale_preview で行われます。
+        """
+        pixmap = self._original_image_pixmap
+        if pixmap is None or pixmap.isNull():
+            return
+        target_width = self._preview_target_pixel_width()
+        current_pixmap = self.img_preview_label.pixmap()
+        if current_pixmap is not None and abs(current_pixmap.width() - target_width) < PREVIEW_FAST_RESCALE_MIN_DELTA:
+            # 既に目標幅 (またはほぼ同じ幅) で表示中。正確な幅への調整はデバウンス後の再スケーリングに任せる
+            return
+        fast_pixmap = self._get_cached_scaled_preview(target_width)
+        if fast_pixmap is None:
+            fast_pixmap = self._scale_preview(pixmap, target_width, Qt.FastTransformation)
+        self._set_preview_pixmap(fast_pixmap)
+
+    def _stop_preview_movie(self):
+        """GIFプレビュー用のQMovieが再生中であれば停止して破棄します。"""
+        if self._preview_movie is not None:
+            self._preview_movie.stop()
+            self._preview_movie.deleteLater()
+            self._preview_movie = None
+
     
     def resizeEvent(self, event: 'QResizeEvent'):
         """ウィンドウのリサイズイベント。
@@ -727,20 +1657,22 @@ class DetailWindow(QWidget):
         if hasattr(self, 'item_data') and self.item_data and hasattr(self, 'img_preview_label') and self.img_preview_label.isVisible():
             # item_data がロードされていて、プレビューラベルが表示されている場合のみ更新
             current_image_path = self.item_data.get("image_path")
+            if current_image_path and self._is_smooth_preview_displayed(self._preview_target_pixel_width()):
+                return # 表示幅が変わっていなければスケーリングもタイマーも不要
             if current_image_path: # 画像パスがあれば再描画
-                 print(f"DetailWindow.resizeEvent: Updating image preview for {current_image_path}")
-                 # 少し遅延させて、レイアウトが安定してから再描画
-                 from PyQt5.QtCore import QTimer
-                 QTimer.singleShot(50, lambda: self._update_image_preview(current_image_path))
+                 # リサイズ中は高速なスケーリングで追従し、落ち着いてから一度だけ高品質に再スケーリングする
+                 self._apply_fast_preview_scale()
+                 self._resize_timer.start()
         # --- ★★★ ------------------------------------------ ★★★ ---
 
     def add_history_entry_with_ai_ui(self):
         """AIの支援を受けて新しい履歴エントリを作成し、UI経由で追加します。"""
+        from core.gemini_handler import is_configured as gemini_is_configured
         if not gemini_is_configured():
-            QMessageBox.warning(self, "APIキー未設定", "Gemini APIキーが設定されていません。設定画面でキーを登録してください。")
+            self._warn("APIキー未設定", "Gemini APIキーが設定されていません。設定画面でキーを登録してください。")
             return
         if not self.item_data or not self.current_project_dir_name or not self.current_category:
-            QMessageBox.warning(self, "情報不足", "アイテムデータ、プロジェクト、またはカテゴリが正しく読み込まれていません。")
+            self._warn("情報不足", "アイテムデータ、プロジェクト、またはカテゴリが正しく読み込まれていません。")
             return
 
         item_name = self.item_data.get("name", "このアイテム")
@@ -748,7 +1680,7 @@ class DetailWindow(QWidget):
         existing_history_entries = self.item_data.get("history", [])
         
         # --- 履歴コンテキストの整形 (最大件数はメインウィンドウから取得できるようにしたい) ---
-        main_window_for_hist = get_main_window_instance()
+        main_window_for_hist = self._main_window()
         max_history_for_context_ui = 5 # デフォルト値
         if main_window_for_hist:
             # MainWindowに `get_item_history_range_for_prompt()` のようなメソッドがあるか、
@@ -766,12 +1698,10 @@ class DetailWindow(QWidget):
             # プロンプトが長くなりすぎるのを防ぐために、ここで絞っても良い。
             # 今回は、テンプレート側で絞ることを期待し、ある程度の件数を渡す。
             # (ただし、あまりにも長大な履歴は問題になる可能性があるので、適度に制限するのが望ましい)
-            # ここでは最大10件に制限してみる。
-            num_to_show = 10 
-            shown_entries = []
-            for entry_dict in reversed(existing_history_entries[-num_to_show:]):
-                shown_entries.append(f"- {entry_dict.get('entry', '(内容なし)')}")
-            history_context_str = "\n".join(shown_entries)
+            # ここでは最大 HISTORY_CONTEXT_MAX_ENTRIES 件に制限する。
+            # (整形済みの直近履歴行は self._recent_history_lines に保持している)
+            num_to_show = HISTORY_CONTEXT_MAX_ENTRIES
+            history_context_str = "\n".join(reversed(self._recent_history_lines))
             if len(existing_history_entries) > num_to_show:
                 history_context_str += f"\n... (他{len(existing_history_entries) - num_to_show}件)"
         
@@ -782,254 +1712,423 @@ class DetailWindow(QWidget):
             ai_prompts = project_settings.get("ai_edit_prompts", DEFAULT_PROJECT_SETTINGS.get("ai_edit_prompts", {}))
             raw_template = ai_prompts.get("history_entry_add", "")
             
-            # {max_item_history_entries} の値を決定 (設定画面にUIがないので仮の値)
-            # 本来は設定から取得するべきだが、今回は固定値で。5件くらいが妥当か。
-            max_entries_for_template_placeholder = 5 
-
+            # {max_item_history_entries} の値 (設定画面にUIがないので固定値)
             placeholders = {
                 "item_name": item_name,
                 "user_instruction": "", # ダイアログでユーザーが入力
                 "item_description": item_desc,
                 "item_existing_history": history_context_str, # 整形済み履歴
-                "max_item_history_entries": max_entries_for_template_placeholder
+                "max_item_history_entries": HISTORY_TEMPLATE_MAX_ENTRIES
             }
             try:
                 initial_instruction = raw_template.format(**placeholders)
             except KeyError as e:
-                QMessageBox.warning(self, "テンプレートエラー", f"履歴追加プロンプトのフォーマットに失敗: {e}")
+                self._warn("テンプレートエラー", f"履歴追加プロンプトのフォーマットに失敗: {e}")
             except Exception as e:
-                 QMessageBox.critical(self, "致命的なテンプレートエラー", f"履歴プロンプト生成中に予期せぬエラー: {e}")
+                 self._error("致命的なテンプレートエラー", f"履歴プロンプト生成中に予期せぬエラー: {e}")
                  return
         else:
-            QMessageBox.warning(self, "設定エラー", "プロジェクト設定を読み込めず、デフォルトの指示を使用します。")
+            self._warn("設定エラー", "プロジェクト設定を読み込めず、デフォルトの指示を使用します。")
             # フォールバック (プロジェクト設定がない場合)
             # (この部分は、仕様に応じてより詳細なエラー処理やデフォルトテンプレートの提供を検討)
-            initial_instruction = f"アイテム「{item_name}」の新しい履歴エントリを作成してください。ユーザーの指示を考慮してください。"
+            initial_instruction = HISTORY_INSTRUCTION_FALLBACK_TEMPLATE.format(item_name=item_name)
 
         self.ai_edit_dialog_mode = "history" # モード設定
-        self.ai_edit_dialog = AIAssistedEditDialog(
-            initial_instruction_text=initial_instruction,
-            current_item_description=item_desc, # 履歴モードではコンテキストとして利用
-            parent=self,
-            window_title=f"AIで「{item_name}」の履歴エントリを生成"
-        )
-        # 接続は変わらず
-        self.ai_edit_dialog.request_ai_button.clicked.connect(
-            lambda: self._handle_ai_suggestion_request( # ラムダでラップ
-                self.ai_edit_dialog.get_instruction_text()
-            )
+        self.ai_edit_dialog = self._get_shared_ai_dialog(
+            initial_instruction,
+            f"AIで「{item_name}」の履歴エントリを生成"
         )
 
         if self.ai_edit_dialog.exec_() == QDialog.Accepted:
             new_history_entry_text = self.ai_edit_dialog.get_final_text().strip()
             if new_history_entry_text:
-                success, message = add_history_entry(self.current_project_dir_name,
-                                                   self.current_category,
-                                                   self.current_item_id,
-                                                   new_history_entry_text)
-                if success:
-                    QMessageBox.information(self, "履歴追加成功", "新しい履歴エントリが追加されました。")
-                    self.load_data(self.current_category, self.current_item_id) # 再読み込みして表示更新
-                else:
-                    QMessageBox.critical(self, "履歴追加失敗", f"履歴エントリの追加に失敗しました。\n{message}")
+                # 保留中の編集・削除を先に保存してから、追記ログに1行だけ書き込む
+                # (アイテム全体の書き直し、ファイルの再読み込み、UI全体の再構築は行わない)
+                new_entry = create_history_entry(new_history_entry_text)
+                # (保留中の変更の保存に失敗した場合は _flush_pending_history 内でエラーを表示済み)
+                if self._flush_pending_history() and append_history_log_entry(
+                        self.current_project_dir_name, self.current_category, self.current_item_id, new_entry):
+                    self._append_history_row(new_entry)
+                    self._show_status_message("新しい履歴エントリを追加しました。")
+                elif not self._history_dirty:
+                    self._error("履歴追加失敗", "履歴エントリの追加に失敗しました。")
             else:
-                QMessageBox.information(self, "履歴未追加", "履歴エントリのテキストが空だったため、追加されませんでした。")
-        self.ai_edit_dialog = None # インスタンスをクリア
+                self._show_status_message("履歴エントリのテキストが空だったため、追加されませんでした。")
+        self.ai_edit_dialog = None # 参照をクリア (ダイアログ自体は使い回す)
+
+    def _selected_history_row(self) -> int:
+        """履歴リストで選択されている行を返します。
+
+        Returns:
+            int: 選択中の行 (0始まり)。選択がなければ -1。
+        """
+        selected_indexes = self.history_list_view.selectionModel().selectedIndexes()
+        return selected_indexes[0].row() if selected_indexes else -1
+
+    def _on_history_context_menu(self, pos):
+        """履歴リストの行が右クリックされたときに、その行の「編集」「削除」メニューを表示します。
+
+        Args:
+            pos (QPoint): ビューポート座標でのクリック位置。
+        """
+        model_index = self.history_list_view.indexAt(pos)
+        if not model_index.isValid():
+            return
+        row = model_index.row()
+        menu = QMenu(self.history_list_view)
+        edit_action = menu.addAction("編集")
+        delete_action = menu.addAction("削除")
+        chosen_action = menu.exec_(self.history_list_view.viewport().mapToGlobal(pos))
+        if chosen_action is edit_action:
+            self._edit_history_at(row)
+        elif chosen_action is delete_action:
+            self._delete_history_at(row)
 
     # 履歴編集UIメソッド
     def edit_history_entry_ui(self):
         """「履歴を編集」ボタンがクリックされたときの処理。
-        ユーザーに番号で編集対象の履歴を指定させ、複数行入力ダイアログで編集させ、変更を保存します。
+        選択中の履歴 (未選択の場合は先頭) を初期表示にして、編集ダイアログを開きます。
+        """
+        self._edit_history_at(max(0, self._selected_history_row()))
+
+    def _edit_history_at(self, index: int):
+        """指定された位置の履歴エントリを初期表示にして HistoryEditDialog を開き、変更をメモリ上とログに反映します。
+
+        ダイアログ内で別の履歴を選び直した場合は、その履歴を編集します。
+
+        Args:
+            index (int): 初期表示する履歴のインデックス (0始まり)。
         """
         if not self.item_data or not self.current_category or not self.current_item_id or not self.current_project_dir_name:
-            QMessageBox.warning(self, "エラー", "履歴を編集するアイテムが選択されていません。")
+            self._warn("エラー", "履歴を編集するアイテムが選択されていません。")
             return
 
         history_list = self.item_data.get("history", [])
         if not history_list:
-            QMessageBox.information(self, "履歴なし", "編集できる履歴がありません。")
+            self._info("履歴なし", "編集できる履歴がありません。")
             return
 
         num_entries = len(history_list)
-        entry_number, ok = QInputDialog.getInt(
-            self, "履歴編集",
-            f"編集する履歴の番号を入力してください (1～{num_entries}):",
-            min=1, max=num_entries, value=1
-        )
-
-        if ok:
-            index_to_edit = entry_number - 1 # 0ベースのインデックス
-            if 0 <= index_to_edit < num_entries:
-                current_entry_dict = history_list[index_to_edit]
-                current_entry_text = current_entry_dict.get('entry', '')
-
-                new_entry_text, ok_multiline = QInputDialog.getMultiLineText(
-                    self, "履歴編集",
-                    f"履歴 ({entry_number}) の内容を編集してください:",
-                    current_entry_text
-                )
-
-                if ok_multiline and new_entry_text.strip() != current_entry_text.strip(): # 内容が変更された場合のみ
-                    # 履歴エントリの 'entry' を更新
-                    # (id や timestamp は変更しない)
-                    self.item_data['history'][index_to_edit]['entry'] = new_entry_text.strip()
-
-                    if update_item(self.current_project_dir_name, self.current_category, self.current_item_id, {"history": self.item_data['history']}):
-                        QMessageBox.information(self, "履歴編集完了", f"履歴エントリ ({entry_number}) を更新しました。")
-                        self.load_data(self.current_category, self.current_item_id) # UIを再読み込み
-                    else:
-                        QMessageBox.warning(self, "履歴編集エラー", "履歴の編集内容の保存に失敗しました。")
-                        # 保存失敗時はメモリ上の item_data['history'] を元に戻す方が安全
-                        self.item_data['history'][index_to_edit]['entry'] = current_entry_text # 元に戻す
-                elif ok_multiline: # OK押したが変更なし
-                    QMessageBox.information(self, "変更なし", "履歴内容は変更されませんでした。")
-            else:
-                QMessageBox.warning(self, "入力エラー", f"無効な番号です。1から{num_entries}の間で指定してください。")
+        dialog = HistoryEditDialog(history_list, parent=self, initial_number=index + 1)
+        accepted = dialog.exec_() == QDialog.Accepted
+        index_to_edit, new_entry_text = dialog.get_result() # 0ベースのインデックス
+        dialog.deleteLater()
+        if not accepted or not 0 <= index_to_edit < num_entries:
+            return
+        entry_number = index_to_edit + 1
+        current_entry_text = history_list[index_to_edit].get('entry', '')
+        new_stripped = new_entry_text.strip() # 比較・保存で使い回す (strip は1回だけ)
+
+        if new_stripped != current_entry_text.strip(): # 内容が変更された場合のみ
+            # 既存のエントリ辞書は書き換えず、'entry' だけを差し替えた新しい辞書で置き換える
+            # (id や timestamp は変更しない。保存中のデータなどと辞書を共有していても影響しない)
+            self.item_data['history'][index_to_edit] = {**history_list[index_to_edit], 'entry': new_stripped}
+            self._persist_history_delta({"op": "replace", "id": history_list[index_to_edit].get('id'),
+                                         "index": index_to_edit, "entry": new_stripped})
+            self._rebuild_recent_history_lines()
+            self._refresh_history_row(index_to_edit) # 編集した行だけを再描画
+            self._show_status_message(f"履歴エントリ ({entry_number}) を更新しました。")
+        else: # OK押したが変更なし
+            self._show_status_message("履歴内容は変更されませんでした。")
 
     # 履歴削除UIメソッド
     def delete_history_entry_ui(self):
         """「履歴を削除」ボタンがクリックされたときの処理。
-        ユーザーに番号で削除対象の履歴を指定させ、削除を実行します。
+        履歴が選択されていればその履歴を、なければ番号と本文のプレビューの一覧から選ばせた履歴を削除します。
         """
         if not self.item_data or not self.current_category or not self.current_item_id or not self.current_project_dir_name:
-            QMessageBox.warning(self, "エラー", "履歴を追加するアイテムが選択されていません。")
+            self._warn("エラー", "履歴を削除するアイテムが選択されていません。")
             return
 
         history_list = self.item_data.get("history", [])
         if not history_list:
-            QMessageBox.information(self, "履歴なし", "削除できる履歴がありません。")
+            self._info("履歴なし", "削除できる履歴がありません。")
             return
 
-        # ユーザーに削除する履歴の番号を入力させる
-        # 履歴は1から始まる番号で表示されている想定
-        num_entries = len(history_list)
-        entry_number, ok = QInputDialog.getInt(
-            self, "履歴削除",
-            f"削除する履歴の番号を入力してください (1～{num_entries}):",
-            min=1, max=num_entries, value=1
+        selected_row = self._selected_history_row()
+        if selected_row >= 0:
+            self._delete_history_at(selected_row)
+            return
+
+        # 未選択の場合は、削除する履歴を番号と本文のプレビューのコンボボックスから選ばせる
+        choices = history_entry_choices(history_list)
+        chosen_text, ok = QInputDialog.getItem(
+            self, HISTORY_DELETE_DIALOG_TITLE, HISTORY_DELETE_PROMPT, choices, 0, False
         )
+        if ok and chosen_text in choices:
+            self._delete_history_at(choices.index(chosen_text))
 
-        if ok:
-            index_to_delete = entry_number - 1 # 0ベースのインデックスに変換
-            if 0 <= index_to_delete < num_entries:
-                entry_to_delete = history_list[index_to_delete]
-                entry_text_preview = entry_to_delete.get('entry', '(内容不明)')[:30] + "..." \
-                                     if len(entry_to_delete.get('entry', '')) > 30 \
-                                     else entry_to_delete.get('entry', '(内容不明)')
-
-                reply = QMessageBox.question(self, "履歴削除確認",
-                                           f"以下の履歴エントリ ({entry_number}) を本当に削除しますか？\n\n「{entry_text_preview}」\n\nこの操作は元に戻せません。",
-                                           QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
-                if reply == QMessageBox.Yes:
-                    # 履歴リストから該当エントリを削除 (IDで照合がより確実だが、今回はインデックスで)
-                    # もし add_history_entry で履歴にIDを振っていれば、そのIDで削除する方が良い
-                    # ここでは、リストから直接削除する
-                    del self.item_data['history'][index_to_delete]
-
-                    if update_item(self.current_project_dir_name, self.current_category, self.current_item_id, {"history": self.item_data['history']}):
-                        QMessageBox.information(self, "履歴削除完了", f"履歴エントリ ({entry_number}) を削除しました。")
-                        self.load_data(self.current_category, self.current_item_id) # UIを再読み込み
-                    else:
-                        QMessageBox.warning(self, "履歴削除エラー", "履歴の削除内容の保存に失敗しました。")
-                        # 失敗した場合、メモリ上の item_data['history'] を元に戻す方が安全
-                        # (今回は簡略化のため、再ロードに任せる)
-            else:
-                QMessageBox.warning(self, "入力エラー", f"無効な番号です。1から{num_entries}の間で指定してください。")
+    def _delete_history_at(self, index: int):
+        """確認のうえで指定された位置の履歴エントリを削除し、メモリ上とログに反映します。
+
+        Args:
+            index (int): 削除する履歴のインデックス (0始まり)。
+        """
+        if not self.item_data or not self.current_category or not self.current_item_id or not self.current_project_dir_name:
+            self._warn("エラー", "履歴を削除するアイテムが選択されていません。")
+            return
+        history_list = self.item_data.get("history", [])
+        if not 0 <= index < len(history_list):
+            return
+
+        entry_number = index + 1
+        entry_to_delete = history_list[index]
+        entry_text_preview = history_entry_preview(entry_to_delete)
+        if not self._confirm(HISTORY_DELETE_CONFIRM_TITLE,
+                             HISTORY_DELETE_CONFIRM_FORMAT.format(number=entry_number, preview=entry_text_preview)):
+            return
+        del self.item_data['history'][index]
+        self._persist_history_delta({"op": "delete", "id": entry_to_delete.get('id'), "index": index})
+        self._rebuild_recent_history_lines()
+        self._remove_history_row(index) # 削除した行だけをリストから取り除く
+        self._show_status_message(f"履歴エントリ ({entry_number}) を削除しました。")
+
+    def _remember_loaded_tags(self):
+        """タグ系フィールドの現在のタグ集合を、保存時の比較用に記録します。"""
+        self._loaded_tag_sets.clear()
+        if not self.item_data:
+            return
+        for tag_field in ('tags', 'reference_tags'):
+            self._loaded_tag_sets[tag_field] = frozenset(self.item_data.get(tag_field) or [])
+
+    def _collect_changed_tags(self, tag_field: str) -> list[str] | None:
+        """タグ入力欄が変更されていれば、新しいタグのリストを返します。
+
+        Args:
+            tag_field (str): 'tags' または 'reference_tags'。
+
+        Returns:
+            list[str] | None: タグ集合が変わった場合は新しいタグのリスト、変更がなければ None。
+        """
+        if tag_field not in self.detail_widgets:
+            return None
+        new_tags_list = self.detail_widgets[tag_field].tokens()
+        # 保存されているタグと比較 (順序無視)
+        if frozenset(new_tags_list) == self._loaded_tag_sets.get(tag_field, frozenset()):
+            return None
+        return new_tags_list
+
+    def _is_field_modified(self, field: str) -> bool:
+        """入力欄がロード (または保存) 以降にユーザーによって編集されたかどうかを返します。
+
+        Args:
+            field (str): detail_widgets のキー ('name', 'description', 'tags', 'reference_tags')。
+
+        Returns:
+            bool: 編集されていれば True。入力欄が存在しなければ False。
+        """
+        widget = self.detail_widgets.get(field)
+        if isinstance(widget, (QLineEdit, TagChipEdit)):
+            return widget.isModified()
+        if isinstance(widget, QPlainTextEdit):
+            return widget.document().isModified()
+        return False
+
+    def _set_fields_modified(self, modified: bool, fields=EDITABLE_TEXT_FIELDS):
+        """入力欄の変更フラグ (QLineEdit・TagChipEdit の isModified / QTextDocument.isModified) を設定します。
+
+        Args:
+            modified (bool): 設定する値。
+            fields (Iterable[str], optional): 対象のフィールド名。デフォルトは全ての編集可能な入力欄。
+        """
+        for field in fields:
+            widget = self.detail_widgets.get(field)
+            if isinstance(widget, (QLineEdit, TagChipEdit)):
+                widget.setModified(modified)
+            elif isinstance(widget, QPlainTextEdit):
+                widget.document().setModified(modified)
 
     def save_details(self):
         """「変更を保存」ボタンがクリックされたときの処理。編集内容をファイルに保存します。"""
         if not self.item_data or not self.current_category or not self.current_item_id or not self.current_project_dir_name:
-            QMessageBox.warning(self, "保存エラー", "保存するデータがロードされていません。")
+            self._warn("保存エラー", "保存するデータがロードされていません。")
+            return
+
+        # どの入力欄も編集されておらず、保留中の変更もなければ、値の読み出しや比較を行わずに終了
+        modified_fields = [field for field in EDITABLE_TEXT_FIELDS if self._is_field_modified(field)]
+        if not modified_fields and not self._history_dirty and not self._image_path_dirty:
+            self._info("変更なし", "保存する変更点がありません。")
             return
 
-        # --- UIから更新されたデータを収集 ---
-        updated_data_payload = {} # 保存する変更差分
-        changed_fields_count = 0
+        # --- UIから更新されたデータを収集 (編集された入力欄のみ) ---
+        updated_data_payload = {} # 保存する変更差分 (変更のあったキーのみ)
 
         # 名前
-        if 'name' in self.detail_widgets:
+        if 'name' in modified_fields:
             new_name = self.detail_widgets['name'].text().strip()
             if new_name != self.item_data.get('name'):
                 updated_data_payload['name'] = new_name
-                changed_fields_count += 1
 
         # 説明/メモ
-        if 'description' in self.detail_widgets:
+        if 'description' in modified_fields:
             new_desc = self.detail_widgets['description'].toPlainText().strip()
             if new_desc != self.item_data.get('description'):
                 updated_data_payload['description'] = new_desc
-                changed_fields_count += 1
                 
-        # タグ (アイテム自身のタグ)
-        if 'tags' in self.detail_widgets:
-            tags_str = self.detail_widgets['tags'].text()
-            new_tags_list = [tag.strip() for tag in tags_str.split(',') if tag.strip()]
-            # 保存されているリストと比較 (順序無視)
-            # self.item_data.get('tags', []) がNoneの場合も考慮
-            current_tags = self.item_data.get('tags', [])
-            if current_tags is None: current_tags = [] # Noneなら空リストとして扱う
-            if set(new_tags_list) != set(current_tags):
-                updated_data_payload['tags'] = new_tags_list
-                changed_fields_count += 1
-
-        # --- ★★★ 参照先タグの変更を収集 ★★★ ---
-        if 'reference_tags' in self.detail_widgets:
-            ref_tags_str = self.detail_widgets['reference_tags'].text()
-            new_ref_tags_list = [tag.strip() for tag in ref_tags_str.split(',') if tag.strip()]
-            current_ref_tags = self.item_data.get('reference_tags', [])
-            if current_ref_tags is None: current_ref_tags = []
-            if set(new_ref_tags_list) != set(current_ref_tags):
-                updated_data_payload['reference_tags'] = new_ref_tags_list
-                changed_fields_count += 1
-        # --- ★★★ ------------------------- ★★★ ---
-
-        # 画像パス
-        original_item_for_image_check = get_item(self.current_project_dir_name, self.current_category, self.current_item_id)
-        if original_item_for_image_check and self.item_data.get('image_path') != original_item_for_image_check.get('image_path'):
-             updated_data_payload['image_path'] = self.item_data.get('image_path')
-             changed_fields_count += 1
-
-        if changed_fields_count == 0:
-            QMessageBox.information(self, "変更なし", "保存する変更点がありません。")
+        # タグ (アイテム自身のタグ) と参照先タグ
+        for tag_field in ('tags', 'reference_tags'):
+            if tag_field not in modified_fields:
+                continue
+            new_tags_list = self._collect_changed_tags(tag_field)
+            if new_tags_list is not None:
+                updated_data_payload[tag_field] = new_tags_list
+
+        # 履歴 (編集・削除で保留中の変更をまとめて保存)
+        if self._history_dirty:
+            # 保存中に履歴が編集されても影響しないようにコピーを渡す
+            updated_data_payload['history'] = [dict(h) for h in self.item_data.get('history', [])]
+
+        # 画像パス (選択・クリア時に立てたフラグで判定し、ファイルの再読み込みは行わない)
+        if self._image_path_dirty:
+            updated_data_payload['image_path'] = self.item_data.get('image_path')
+
+        # 編集されたが元の値に戻っていた入力欄は、次回以降の比較対象から外す
+        self._set_fields_modified(False, modified_fields)
+
+        if not updated_data_payload:
+            self._info("変更なし", "保存する変更点がありません。")
+            return
+
+        # --- ファイルへの書き込みはワーカースレッドで行い、完了後に _on_item_saved で結果を反映 ---
+        self._history_dirty = False
+        self._image_path_dirty = False
+        self._save_worker = ItemSaveWorker(self.current_project_dir_name, self.current_category,
+                                           self.current_item_id, updated_data_payload)
+        worker = self._save_worker
+        worker.save_finished.connect(lambda success, w=worker: self._on_item_saved(w, success))
+        self.save_button.setEnabled(False)
+        self.save_button.setText("保存中...")
+        worker.start()
+
+    def _on_item_saved(self, worker: ItemSaveWorker, success: bool):
+        """保存ワーカーの完了時に呼び出され、保存結果をUIとメモリ上のデータに反映します。
+
+        Args:
+            worker (ItemSaveWorker): 完了した保存ワーカー。
+            success (bool): 保存が成功したかどうか。
+        """
+        if self._save_worker is worker:
+            self._save_worker = None
+        worker.wait() # run() の終了を待ってから破棄する
+        worker.deleteLater()
+        self.save_button.setText("変更を保存")
+        self.save_button.setEnabled(self.item_data is not None)
+
+        payload = worker.payload
+        # 保存中に別のアイテムへ切り替えられていないか
+        is_current_item = (self.item_data is not None
+                           and worker.category == self.current_category
+                           and worker.item_id == self.current_item_id)
+        if success:
+            if is_current_item:
+                # ローカルの item_data も更新 (履歴はメモリ上のものが最新なので上書きしない)
+                self.item_data.update((key, value) for key, value in payload.items() if key != 'history')
+                if 'image_path' in payload:
+                    self._saved_image_path = payload['image_path']
+                for tag_field in ('tags', 'reference_tags'):
+                    if tag_field in payload:
+                        self._loaded_tag_sets[tag_field] = frozenset(payload[tag_field])
+                # ウィンドウタイトル更新 (名前変更時)
+                if 'name' in payload:
+                    self.setWindowTitle(f"詳細: {payload['name']} ({self.current_category})")
+            self._info("保存完了", "変更を保存しました。")
+            self._queue_data_saved(worker.category, worker.item_id)
+        else:
+            if is_current_item:
+                # 保存できなかった変更は、次回の保存で再度書き込む
+                if 'history' in payload:
+                    self._history_dirty = True
+                if 'image_path' in payload:
+                    self._image_path_dirty = True
+                self._set_fields_modified(True, [field for field in EDITABLE_TEXT_FIELDS if field in payload])
+            self._warn("保存エラー", "変更の保存に失敗しました。")
+
+    def _queue_data_saved(self, category: str, item_id: str):
+        """dataSaved の発行を予約します。同じイベントループ内の同じアイテムの保存は1回にまとめます。
+
+        Args:
+            category (str): 保存されたアイテムのカテゴリ名。
+            item_id (str): 保存されたアイテムのID。
+        """
+        self._pending_saved_items[(category, item_id)] = None
+        self._data_saved_emit_timer.start()
+
+    def _flush_data_saved(self):
+        """予約されている dataSaved を、アイテムごとに1回ずつ発行します。"""
+        self._data_saved_emit_timer.stop()
+        pending_items = list(self._pending_saved_items)
+        self._pending_saved_items.clear()
+        for category, item_id in pending_items:
+            self.dataSaved.emit(category, item_id)
+
+    def export_item_readable(self):
+        """「読みやすい形式で書き出し」ボタンがクリックされたときの処理。
+
+        保留中の履歴の変更と実行中の保存を先にファイルへ反映してから、
+        保存済みのアイテムデータをインデント付きのJSONファイルとして書き出します。
+        「変更を保存」していない名前や説明などの編集内容は含まれません。
+        """
+        if not self.item_data or not self.current_project_dir_name or not self.current_category or not self.current_item_id:
+            self._warn("書き出しエラー", "書き出すアイテムが選択されていません。")
+            return
+
+        default_name = f"{self.item_data.get('name') or self.current_item_id}.json"
+        export_filepath, _ = QFileDialog.getSaveFileName(
+            self, "アイテムを書き出し", default_name, "JSONファイル (*.json)"
+        )
+        if not export_filepath:
             return
 
-        if update_item(self.current_project_dir_name, self.current_category, self.current_item_id, updated_data_payload):
-            QMessageBox.information(self, "保存完了", "変更を保存しました。")
-            # ローカルの item_data も更新
-            for key, value in updated_data_payload.items():
-                self.item_data[key] = value
-            # ウィンドウタイトル更新 (名前変更時)
-            if 'name' in updated_data_payload:
-                self.setWindowTitle(f"詳細: {updated_data_payload['name']} ({self.current_category})")
-            self.dataSaved.emit(self.current_category, self.current_item_id)
+        self._flush_pending_history() # 保存ワーカーの完了も待つ
+        if export_item_pretty(self.current_project_dir_name, self.current_category, self.current_item_id, export_filepath):
+            self._show_status_message(f"書き出しました: {export_filepath}")
         else:
-            QMessageBox.warning(self, "保存エラー", "変更の保存に失敗しました。")
+            self._error("書き出しエラー", f"アイテムの書き出しに失敗しました。\n{export_filepath}")
+
+    def _wait_for_pending_save(self):
+        """保存ワーカーが実行中であれば、その書き込みが終わるまで待機します。"""
+        if self._save_worker is not None and self._save_worker.isRunning():
+            self._save_worker.wait()
 
 
     def closeEvent(self, event):
         """ウィンドウが閉じられるときに呼び出されるイベントハンドラ。"""
-        print("DetailWindow is closing.")
+        log.debug("DetailWindow is closing.")
+        self._flush_pending_history() # 保留中の履歴変更を保存 (実行中の保存ワーカーの完了も待つ)
+        self._wait_for_image_decodes()
+        if self._image_copy_worker is not None:
+            self._image_copy_worker.wait() # コピー途中のファイルを残さない
+        self._flush_data_saved() # 予約中の保存通知を、ウィンドウが閉じたことの通知より先に送る
         self.windowClosed.emit()
         # 必要なら未保存の変更があるか確認して警告を出す処理を追加
         super().closeEvent(event)
 
 
 if __name__ == '__main__':
-    """DetailWindow の基本的な表示・インタラクションテスト。"""
+    """DetailWindow の基本的な表示・インタラクションテスト。
+
+    テスト用プロジェクトが既にあれば再作成しません (環境変数 REBUILD_TEST で再作成)。
+    環境変数 CLEAN_TEST を設定すると、終了時にテスト用プロジェクトを削除します。
+    """
     app = QApplication(sys.argv)
     test_project_name_detail = "detail_window_test_hist_del"; test_category_name_detail = "テストキャラ履歴削除"; test_item_id_detail = "char-test-hist-del-001"
-    from core.config_manager import save_project_settings as sps, DEFAULT_PROJECT_SETTINGS as DPS
-    sps(test_project_name_detail, DPS.copy())
-    from core.data_manager import create_category as dmcc, add_item as dmai
-    dmcc(test_project_name_detail, test_category_name_detail)
-    dmai(test_project_name_detail, test_category_name_detail, {"id": test_item_id_detail, "name": "履歴削除テスト勇者", "description": "初期説明。", "history": [{"id":"dummy-uuid-1", "timestamp":"2024-01-01", "entry":"冒険開始"}, {"id":"dummy-uuid-2", "timestamp":"2024-01-02", "entry":"ドラゴン遭遇"}], "tags": ["テスト"], "image_path": None})
-    main_test_config = {"model": "gemini-1.5-flash-latest"}
-    detail_win = DetailWindow(main_config=main_test_config, project_dir_name=test_project_name_detail)
-    detail_win.load_data(test_category_name_detail, test_item_id_detail)
-    detail_win.dataSaved.connect( lambda cat, iid: print(f"\n--- Signal: dataSaved received for Category='{cat}', ItemID='{iid}' ---"))
-    detail_win.windowClosed.connect( lambda: print("\n--- Signal: windowClosed received ---"))
-    detail_win.show(); app_exit_code = app.exec_()
-    import shutil; test_project_dir_to_remove = os.path.join("data", test_project_name_detail)
-    if os.path.exists(test_project_dir_to_remove): shutil.rmtree(test_project_dir_to_remove)
+    test_project_dir = os.path.join(PROJECTS_BASE_DIR, test_project_name_detail)
+    if not os.path.isdir(test_project_dir) or os.environ.get("REBUILD_TEST"):
+        from core.config_manager import save_project_settings as sps, DEFAULT_PROJECT_SETTINGS as DPS
+        sps(test_project_name_detail, DPS.copy())
+        from core.data_manager import create_category as dmcc, add_item as dmai, delete_item as dmdi
+        dmcc(test_project_name_detail, test_category_name_detail)
+        dmdi(test_project_name_detail, test_category_name_detail, test_item_id_detail) # 再作成時は既存のアイテムを置き換える
+        dmai(test_project_name_detail, test_category_name_detail, {"id": test_item_id_detail, "name": "履歴削除テスト勇者", "description": "初期説明。", "history": [{"id":"dummy-uuid-1", "timestamp":"2024-01-01", "entry":"冒険開始"}, {"id":"dummy-uuid-2", "timestamp":"2024-01-02", "entry":"ドラゴン遭遇"}], "tags": ["テスト"], "image_path": None})
+    app_exit_code = 1
+    try:
+        main_test_config = {"model": "gemini-1.5-flash-latest"}
+        detail_win = DetailWindow(main_config=main_test_config, project_dir_name=test_project_name_detail)
+        detail_win.load_data(test_category_name_detail, test_item_id_detail)
+        detail_win.dataSaved.connect( lambda cat, iid: print(f"\n--- Signal: dataSaved received for Category='{cat}', ItemID='{iid}' ---"))
+        detail_win.windowClosed.connect( lambda: print("\n--- Signal: windowClosed received ---"))
+        detail_win.show(); app_exit_code = app.exec_()
+    finally:
+        if os.environ.get("CLEAN_TEST") and os.path.exists(test_project_dir):
+            shutil.rmtree(test_project_dir)
     sys.exit(app_exit_code)
-
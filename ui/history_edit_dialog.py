@@ -0,0 +1,163 @@
+# ui/history_edit_dialog.py
+
+"""アイテムの履歴エントリを1つ選んで編集するためのダイアログを提供します。
+
+このダイアログ (`HistoryEditDialog`) は、編集する履歴の選択と、
+その内容の編集を1つのウィンドウで行えるようにします。
+選択を変更すると、対応する履歴エントリの内容が編集エリアに読み込まれます。
+編集中の内容がある場合は、破棄してよいかを確認してから切り替えます。
+
+履歴の選択肢に使う文字列を作る `history_entry_preview` / `history_entry_choices` も提供します。
+"""
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QFormLayout, QComboBox, QPlainTextEdit, QDialogButtonBox,
+    QLabel, QWidget, QApplication, QMessageBox
+)
+
+HISTORY_PREVIEW_MAX_CHARS = 30 # 選択肢や確認メッセージに表示する履歴本文の最大文字数
+
+
+def history_entry_preview(entry_dict: dict, max_chars: int = HISTORY_PREVIEW_MAX_CHARS) -> str:
+    """履歴エントリの本文の先頭部分を、1行のプレビュー文字列にします。
+
+    長い本文でも先頭部分だけを切り出します (本文全体のコピーは作らない)。
+
+    Args:
+        entry_dict (dict): 履歴エントリ辞書。
+        max_chars (int, optional): プレビューに含める最大文字数。
+
+    Returns:
+        str: 改行を空白に置き換えたプレビュー。切り詰めた場合は末尾に "..." を付ける。
+    """
+    entry_text = entry_dict.get('entry') or '(内容不明)'
+    preview = entry_text[:max_chars]
+    if len(entry_text) > max_chars:
+        preview += "..."
+    return preview.replace("\n", " ")
+
+
+def history_entry_choices(history_entries: list[dict]) -> list[str]:
+    """履歴エントリのリストから、"(番号) プレビュー" 形式の選択肢のリストを作ります。
+
+    Args:
+        history_entries (list[dict]): 履歴エントリ辞書のリスト。
+
+    Returns:
+        list[str]: 履歴の順に並んだ選択肢の文字列。番号は1始まり。
+    """
+    return [f"({number}) {history_entry_preview(entry_dict)}"
+            for number, entry_dict in enumerate(history_entries, start=1)]
+
+
+class HistoryEditDialog(QDialog):
+    """履歴エントリの選択と内容編集をまとめて行うダイアログクラス。
+
+    Attributes:
+        entry_combo (QComboBox): 編集する履歴を、番号と本文のプレビューで選択するコンボボックス。
+        entry_text_edit (QPlainTextEdit): 選択中の履歴エントリの内容を編集するテキストエリア。
+    """
+
+    def __init__(self,
+                 history_entries: list[dict],
+                 parent: QWidget | None = None,
+                 initial_number: int = 1):
+        """HistoryEditDialogのコンストラクタ。
+
+        Args:
+            history_entries (list[dict]): 編集対象となる履歴エントリ辞書のリスト。
+                                          各辞書は 'entry' キーに内容を持つことを想定。
+            parent (QWidget | None, optional): 親ウィジェット。デフォルトは None。
+            initial_number (int, optional): 最初に選択しておく履歴の番号 (1始まり)。デフォルトは 1。
+        """
+        super().__init__(parent)
+        self.history_entries = history_entries
+        """list[dict]: 編集対象の履歴エントリのリスト (このダイアログ内では変更しない)。"""
+        self._loaded_index: int = -1
+        """int: 編集エリアに内容を読み込んでいる履歴のインデックス。選択の切り替えを取り消すときに戻す。"""
+
+        self.setWindowTitle("履歴編集")
+        self.setMinimumSize(500, 350)
+
+        layout = QVBoxLayout(self)
+        form_layout = QFormLayout()
+
+        num_entries = len(history_entries)
+        self.entry_combo = QComboBox()
+        self.entry_combo.addItems(history_entry_choices(history_entries))
+        form_layout.addRow("編集する履歴:", self.entry_combo)
+        layout.addLayout(form_layout)
+
+        layout.addWidget(QLabel("内容:"))
+        self.entry_text_edit = QPlainTextEdit()
+        layout.addWidget(self.entry_text_edit)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+        # 選択が変わるたびに、対応する履歴の内容を編集エリアに読み込む
+        self.entry_combo.setCurrentIndex(min(max(1, initial_number), max(1, num_entries)) - 1)
+        self._load_entry_text(self.entry_combo.currentIndex())
+        self.entry_combo.currentIndexChanged.connect(self._on_entry_selection_changed)
+
+    def _on_entry_selection_changed(self, index: int):
+        """編集する履歴の選択が変わったときの処理。
+
+        編集中の内容がある場合は破棄してよいかを確認し、破棄しない場合は選択を元に戻します。
+
+        Args:
+            index (int): 新しく選択された履歴のインデックス (0始まり)。
+        """
+        if index == self._loaded_index:
+            return
+        if self.entry_text_edit.document().isModified():
+            reply = QMessageBox.question(self, "編集内容の破棄",
+                                         "編集中の内容は破棄されます。別の履歴に切り替えますか？",
+                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                self.entry_combo.blockSignals(True)
+                self.entry_combo.setCurrentIndex(self._loaded_index)
+                self.entry_combo.blockSignals(False)
+                return
+        self._load_entry_text(index)
+
+    def _load_entry_text(self, index: int):
+        """指定された位置の履歴エントリの内容を編集エリアに表示します。
+
+        Args:
+            index (int): 履歴のインデックス (0始まり)。
+        """
+        if 0 <= index < len(self.history_entries):
+            self.entry_text_edit.setPlainText(self.history_entries[index].get('entry', ''))
+        else:
+            self.entry_text_edit.clear()
+        self.entry_text_edit.document().setModified(False) # 読み込んだ直後は未編集とする
+        self._loaded_index = index
+
+    def get_result(self) -> tuple[int, str]:
+        """選択された履歴のインデックスと、編集後のテキストを取得します。
+
+        ダイアログが `Accepted` で閉じられた後に呼び出されることを想定しています。
+
+        Returns:
+            tuple[int, str]: (0始まりのインデックス, 編集後のテキスト)。
+        """
+        return self.entry_combo.currentIndex(), self.entry_text_edit.toPlainText()
+
+
+if __name__ == '__main__':
+    """HistoryEditDialog の基本的な表示テスト。"""
+    import sys
+    app = QApplication(sys.argv)
+    sample_history = [
+        {"id": "1", "entry": "村に到着した。"},
+        {"id": "2", "entry": "ゴブリンと戦闘。\n勝利した。"},
+    ]
+    dialog = HistoryEditDialog(sample_history)
+    if dialog.exec_() == QDialog.Accepted:
+        print(f"\nDialog Accepted. Result: {dialog.get_result()}")
+    else:
+        print("\nDialog Cancelled.")
+    sys.exit(0)
@@ -0,0 +1,253 @@
+# ui/history_list_view.py
+
+"""アイテムの履歴エントリを一覧表示するためのモデルとデリゲートを提供します。
+
+`HistoryListModel` は履歴エントリのリストを `QListView` に提供するモデルで、
+各エントリの表示用HTMLは表示されるときに初めて作成し、行ごとにキャッシュします。
+`HistoryItemDelegate` はそのHTMLを `QTextDocument` で描画するデリゲートで、
+レイアウト済みの文書を (HTML, 表示幅) ごとにキャッシュして再利用します。
+
+履歴全体を1つのリッチテキストとして組み立てる方式と異なり、
+実際に画面に表示される行だけが整形・レイアウトされます。
+"""
+
+import html
+from collections import OrderedDict
+from PyQt5.QtWidgets import (
+    QListView, QStyledItemDelegate, QStyleOptionViewItem, QStyle, QApplication
+)
+from PyQt5.QtGui import QTextDocument, QPainter
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize
+
+
+HISTORY_HTML_ROLE = Qt.UserRole + 1 # 通し番号付きの表示用HTMLを返すデータロール
+HISTORY_DOCUMENT_CACHE_SIZE = 200 # デリゲートがキャッシュするレイアウト済み文書の最大数
+HISTORY_DOCUMENT_MARGIN = 4 # 各行の文書の余白 (px)
+_HISTORY_HTML_TRANSLATION = str.maketrans({" ": "&nbsp;", "\n": "<br>"}) # 半角スペースと改行の置換表
+
+
+def format_history_entry_html(entry_dict: dict) -> str:
+    """履歴エントリ1件の本文を、表示用のHTML断片に整形します (通し番号は含まない)。
+
+    Args:
+        entry_dict (dict): 履歴エントリ辞書。
+
+    Returns:
+        str: 履歴本文のHTML文字列。
+    """
+    # 1. <, >, & をエスケープ (履歴本文がHTMLとして解釈されないようにする)
+    # 2. 半角スペースを &nbsp; に、改行を <br> に置換 (str.translate で1回の走査にまとめる)
+    return html.escape(entry_dict.get('entry', '(内容なし)'), quote=False).translate(_HISTORY_HTML_TRANSLATION)
+
+
+class HistoryListModel(QAbstractListModel):
+    """履歴エントリのリストを QListView に提供するモデルクラス。
+
+    エントリのリスト自体は呼び出し元 (DetailWindow の item_data['history']) と共有します。
+    リストを変更した後は、対応する通知メソッド (entry_appended など) を呼び出してください。
+    """
+
+    def __init__(self, parent=None):
+        """HistoryListModelのコンストラクタ。
+
+        Args:
+            parent (QObject | None, optional): 親オブジェクト。
+        """
+        super().__init__(parent)
+        self._entries: list[dict] = []
+        """list[dict]: 表示する履歴エントリのリスト (呼び出し元と共有)。"""
+        self._html_cache: list[str | None] = []
+        """list[str | None]: 行ごとの本文HTMLのキャッシュ (未作成は None)。行数もこのリストの長さで管理する。"""
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """行数 (履歴エントリの件数) を返します。"""
+        return 0 if parent.isValid() else len(self._html_cache)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        """指定された行のデータを返します。
+
+        Args:
+            index (QModelIndex): 対象の行。
+            role (int, optional): データロール。DisplayRole はプレーンテキスト、
+                HISTORY_HTML_ROLE は通し番号付きのHTML。
+
+        Returns:
+            str | None: 指定ロールのデータ。対応しないロールの場合は None。
+        """
+        row = index.row()
+        if not index.isValid() or not 0 <= row < len(self._html_cache):
+            return None
+        if role == HISTORY_HTML_ROLE:
+            body_html = self._html_cache[row]
+            if body_html is None:
+                body_html = format_history_entry_html(self._entries[row])
+                self._html_cache[row] = body_html
+            # 通し番号は行の位置で決まるため、キャッシュせずに付ける
+            return f"<b>({row + 1})</b> {body_html}"
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return f"({row + 1}) {self._entries[row].get('entry', '(内容なし)')}"
+        return None
+
+    def set_entries(self, entries: list[dict]):
+        """表示する履歴エントリのリストを設定し直します。HTMLはまだ作成しません。
+
+        Args:
+            entries (list[dict]): 履歴エントリ辞書のリスト。
+        """
+        self.beginResetModel()
+        self._entries = entries
+        self._html_cache = [None] * len(entries)
+        self.endResetModel()
+
+    def is_showing(self, entries: list[dict]) -> bool:
+        """指定されたリストが、このモデルの表示しているリストそのものかどうかを返します。"""
+        return self._entries is entries
+
+    def adopt_if_same(self, entries: list[dict]) -> bool:
+        """表示中の履歴と同じ内容と見なせるリストであれば、作成済みのHTMLを残したまま表示するリストだけを差し替えます。
+
+        アイテムを開き直すと、同じ履歴でも別のリストとして読み込まれます。
+        件数と末尾のエントリのID・タイムスタンプが一致すれば同じ履歴と見なし、モデルのリセットを省きます。
+
+        Args:
+            entries (list[dict]): 新しく読み込まれた履歴エントリ辞書のリスト。
+
+        Returns:
+            bool: 差し替えた (同じ内容と見なした) 場合は True。
+        """
+        if self._entries is entries:
+            return True
+        if len(entries) != len(self._entries) or len(self._html_cache) != len(entries):
+            return False
+        if entries:
+            new_last, shown_last = entries[-1], self._entries[-1]
+            if (new_last.get('id'), new_last.get('timestamp')) != (shown_last.get('id'), shown_last.get('timestamp')):
+                return False
+        self._entries = entries # 以降の追加・編集・削除は新しいリストに対して通知される
+        return True
+
+    def entry_appended(self):
+        """共有リストの末尾にエントリが追加されたことを通知し、その行だけを追加します。"""
+        first_row = len(self._html_cache)
+        last_row = len(self._entries) - 1
+        if last_row < first_row:
+            return
+        self.beginInsertRows(QModelIndex(), first_row, last_row)
+        self._html_cache.extend([None] * (last_row - first_row + 1))
+        self.endInsertRows()
+
+    def entry_replaced(self, row: int):
+        """共有リストの指定行のエントリが置き換えられたことを通知します。
+
+        Args:
+            row (int): 置き換えられた行 (0始まり)。
+        """
+        if 0 <= row < len(self._html_cache):
+            self._html_cache[row] = None
+            model_index = self.index(row)
+            self.dataChanged.emit(model_index, model_index)
+
+    def entry_removed(self, row: int):
+        """共有リストから指定行のエントリが削除されたことを通知します。
+
+        後続の行は通し番号が変わるため、表示の更新を通知します。
+
+        Args:
+            row (int): 削除された行 (0始まり)。
+        """
+        if not 0 <= row < len(self._html_cache):
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._html_cache[row]
+        self.endRemoveRows()
+        if row < len(self._html_cache):
+            self.dataChanged.emit(self.index(row), self.index(len(self._html_cache) - 1))
+
+
+class HistoryItemDelegate(QStyledItemDelegate):
+    """HistoryListModel の HISTORY_HTML_ROLE を QTextDocument で描画するデリゲートクラス。
+
+    行のHTMLと表示幅が同じであれば、レイアウト済みの QTextDocument を再利用します。
+    """
+
+    def __init__(self, parent=None):
+        """HistoryItemDelegateのコンストラクタ。
+
+        Args:
+            parent (QObject | None, optional): 親オブジェクト。
+        """
+        super().__init__(parent)
+        self._documents: OrderedDict[tuple[str, int], QTextDocument] = OrderedDict()
+        """OrderedDict: (HTML, 表示幅) をキーとした、レイアウト済み文書のLRUキャッシュ。"""
+
+    def _document(self, html_text: str, width: int, option: QStyleOptionViewItem) -> QTextDocument:
+        """指定HTMLを指定幅でレイアウトした文書を、キャッシュから取得または作成します。"""
+        key = (html_text, width)
+        document = self._documents.get(key)
+        if document is not None:
+            self._documents.move_to_end(key)
+            return document
+        document = QTextDocument()
+        document.setDefaultFont(option.font)
+        document.setDocumentMargin(HISTORY_DOCUMENT_MARGIN)
+        document.setHtml(html_text)
+        document.setTextWidth(width)
+        self._documents[key] = document
+        if len(self._documents) > HISTORY_DOCUMENT_CACHE_SIZE:
+            self._documents.popitem(last=False)
+        return document
+
+    @staticmethod
+    def _row_width(option: QStyleOptionViewItem) -> int:
+        """行の表示幅 (ビューポートの幅) を返します。"""
+        widget = option.widget
+        if isinstance(widget, QListView):
+            return max(1, widget.viewport().width())
+        return max(1, option.rect.width())
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        """行の背景 (選択状態など) を描画し、その上に履歴のHTMLを描画します。"""
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = "" # 文字列はスタイルではなく QTextDocument で描画する
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+
+        document = self._document(index.data(HISTORY_HTML_ROLE) or "", self._row_width(option), option)
+        painter.save()
+        painter.translate(opt.rect.topLeft())
+        painter.setClipRect(0, 0, opt.rect.width(), opt.rect.height())
+        document.drawContents(painter)
+        # エントリ間の区切り線
+        painter.setPen(opt.palette.mid().color())
+        painter.drawLine(0, opt.rect.height() - 1, opt.rect.width(), opt.rect.height() - 1)
+        painter.restore()
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        """行の高さを、表示幅でレイアウトした文書の高さから求めます。"""
+        width = self._row_width(option)
+        document = self._document(index.data(HISTORY_HTML_ROLE) or "", width, option)
+        return QSize(width, int(document.size().height()) + 1) # +1 は区切り線の分
+
+    def clear_cache(self):
+        """キャッシュしているレイアウト済み文書をすべて破棄します。"""
+        self._documents.clear()
+
+
+if __name__ == '__main__':
+    """HistoryListModel / HistoryItemDelegate の基本的な表示テスト。"""
+    import sys
+    app = QApplication(sys.argv)
+    sample_history = [{"id": str(i), "entry": f"履歴エントリ {i}\n<タグ> & 改行を含む本文。"} for i in range(1, 501)]
+    view = QListView()
+    model = HistoryListModel(view)
+    view.setModel(model)
+    view.setItemDelegate(HistoryItemDelegate(view))
+    view.setResizeMode(QListView.Adjust)
+    view.setLayoutMode(QListView.Batched)
+    model.set_entries(sample_history)
+    sample_history.append({"id": "new", "entry": "追加されたエントリ"})
+    model.entry_appended()
+    view.resize(400, 500)
+    view.show()
+    sys.exit(app.exec_())
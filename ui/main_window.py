@@ -403,6 +403,8 @@ class MainWindow(QWidget):
         
         # initial_model_name は self.global_config 確定後に設定
         self.chat_handler: Optional[GeminiChatHandler] = None
+        self.chat_history_revision: int = 0
+        """int: 会話履歴の表示が更新されるたびに増加するカウンタ。DetailWindow の履歴キャッシュ無効化に使用。"""
 
         # --- 送信履歴範囲用のメンバー変数 (初期値は self.global_config 確定後に設定) ---
         self.current_history_range_for_prompt: int = 25 # 一時的なデフォルト値
@@ -1561,6 +1563,7 @@ class MainWindow(QWidget):
                                  オプションで 'timestamp', 'usage' も含む。
             model_name_override (str, optional): AIメッセージの場合のモデル名上書き。
         """
+        self.chat_history_revision += 1 # 履歴が追加されたのでキャッシュを無効化
         if not hasattr(self, 'response_display') or not self.response_display:
             print("Warning: response_display is not initialized. Cannot append message.")
             return
@@ -1658,6 +1661,7 @@ class MainWindow(QWidget):
         各履歴エントリは _format_history_entry_to_html を使って整形されます。
         表示前に現在の内容はクリアされます。
         """
+        self.chat_history_revision += 1 # 履歴が変更された可能性があるのでキャッシュを無効化
         if not hasattr(self, 'response_display') or not self.response_display:
             print("Warning: response_display is not initialized. Skipping chat history redisplay.")
             return
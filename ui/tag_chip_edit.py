@@ -0,0 +1,303 @@
+# ui/tag_chip_edit.py
+
+"""タグをチップ (クリックで削除できるボタン) の並びとして編集するウィジェットを提供します。
+
+`TagChipEdit` はタグを文字列のリストのまま保持し、`setTokens` / `tokens` で受け渡しします。
+アイテムの読み込みや保存のたびにカンマ区切りの文字列へ変換・分割する必要はありません。
+新しいタグは末尾の入力欄に入力し、Enter またはカンマで確定します。
+"""
+
+import re
+from PyQt5.QtWidgets import (
+    QFrame, QLayout, QLineEdit, QToolButton, QWidget, QApplication, QVBoxLayout, QLabel
+)
+from PyQt5.QtCore import Qt, pyqtSignal, QRect, QSize, QPoint, QEvent
+
+_TAG_SPLIT_PATTERN = re.compile(r"\s*,\s*") # カンマと前後の空白でタグを区切る
+TAG_CHIP_STYLE = """
+QToolButton#tagChip {
+    border: 1px solid palette(mid);
+    border-radius: 8px;
+    padding: 1px 6px;
+    background: palette(button);
+}
+QToolButton#tagChip:hover {
+    background: palette(midlight);
+}
+""" # チップの見た目 (角丸の枠付きボタン)
+
+
+def split_tag_text(text: str) -> list[str]:
+    """カンマ区切りの文字列をタグのリストに変換します。
+
+    入力欄への入力や、カンマ区切りのテキストの貼り付けを確定するときに使います。
+
+    Args:
+        text (str): カンマ区切りのタグ文字列。
+
+    Returns:
+        list[str]: 前後の空白を除いたタグのリスト。空のタグと重複は含まない (最初の出現順を保つ)。
+    """
+    raw = text.strip(" \t,") # 前後の空白と余分なカンマを先に落とし、両端に空のタグを作らない
+    if not raw:
+        return []
+    return list(dict.fromkeys(tag for tag in _TAG_SPLIT_PATTERN.split(raw) if tag))
+
+
+class FlowLayout(QLayout):
+    """子ウィジェットを左から右へ並べ、幅が足りなくなったら次の行へ折り返すレイアウトクラス。"""
+
+    def __init__(self, parent: QWidget | None = None, spacing: int = 4):
+        """FlowLayoutのコンストラクタ。
+
+        Args:
+            parent (QWidget | None, optional): レイアウトを設定するウィジェット。
+            spacing (int, optional): ウィジェット間の間隔 (px)。
+        """
+        super().__init__(parent)
+        self._items = []
+        """list[QLayoutItem]: レイアウトに追加されたアイテム (追加順)。"""
+        self.setSpacing(spacing)
+
+    def addItem(self, item):
+        self._items.append(item)
+
+    def count(self) -> int:
+        return len(self._items)
+
+    def itemAt(self, index: int):
+        return self._items[index] if 0 <= index < len(self._items) else None
+
+    def takeAt(self, index: int):
+        return self._items.pop(index) if 0 <= index < len(self._items) else None
+
+    def insertWidget(self, index: int, widget: QWidget):
+        """指定位置にウィジェットを挿入します。
+
+        Args:
+            index (int): 挿入位置。
+            widget (QWidget): 挿入するウィジェット。
+        """
+        self.addChildWidget(widget)
+        self.addWidget(widget) # 末尾に QWidgetItem が作られるので、指定位置へ移動する
+        self._items.insert(index, self._items.pop())
+        self.invalidate()
+
+    def expandingDirections(self):
+        return Qt.Orientations(0)
+
+    def hasHeightForWidth(self) -> bool:
+        return True
+
+    def heightForWidth(self, width: int) -> int:
+        return self._do_layout(QRect(0, 0, width, 0), test_only=True)
+
+    def setGeometry(self, rect: QRect):
+        super().setGeometry(rect)
+        self._do_layout(rect, test_only=False)
+
+    def sizeHint(self) -> QSize:
+        return self.minimumSize()
+
+    def minimumSize(self) -> QSize:
+        size = QSize()
+        for item in self._items:
+            size = size.expandedTo(item.minimumSize())
+        margins = self.contentsMargins()
+        return size + QSize(margins.left() + margins.right(), margins.top() + margins.bottom())
+
+    def _do_layout(self, rect: QRect, test_only: bool) -> int:
+        """アイテムを折り返しながら配置し、必要な高さを返します。
+
+        Args:
+            rect (QRect): 配置に使える領域。
+            test_only (bool): True の場合は配置せず、高さの計算だけを行う。
+
+        Returns:
+            int: すべてのアイテムを配置するのに必要な高さ。
+        """
+        margins = self.contentsMargins()
+        area = rect.adjusted(margins.left(), margins.top(), -margins.right(), -margins.bottom())
+        x, y = area.x(), area.y()
+        line_height = 0
+        spacing = self.spacing()
+        for item in self._items:
+            if item.isEmpty(): # 非表示のウィジェットは詰める
+                continue
+            item_size = item.sizeHint()
+            next_x = x + item_size.width()
+            if next_x > area.right() + 1 and line_height > 0:
+                x = area.x()
+                y += line_height + spacing
+                next_x = x + item_size.width()
+                line_height = 0
+            if not test_only:
+                item.setGeometry(QRect(QPoint(x, y), item_size))
+            x = next_x + spacing
+            line_height = max(line_height, item_size.height())
+        return y + line_height - rect.y() + margins.bottom()
+
+
+class TagChipEdit(QFrame):
+    """タグのリストをチップの並びとして表示・編集するウィジェットクラス。
+
+    チップをクリックするとそのタグを削除し、末尾の入力欄で新しいタグを追加します。
+    ユーザーによる変更の有無は QLineEdit と同様に isModified / setModified で扱います。
+
+    Attributes:
+        input_edit (QLineEdit): 新しいタグを入力する入力欄。
+    """
+    tokensChanged = pyqtSignal(list) # ユーザー操作でタグが追加・削除されたとき (新しいタグのリスト)
+
+    def __init__(self, parent: QWidget | None = None):
+        """TagChipEditのコンストラクタ。
+
+        Args:
+            parent (QWidget | None, optional): 親ウィジェット。
+        """
+        super().__init__(parent)
+        self._tokens: list[str] = []
+        """list[str]: 確定済みのタグのリスト (表示順)。"""
+        self._chips: list[QToolButton] = []
+        """list[QToolButton]: 生成済みのチップ。タグが減っても破棄せず、非表示にして再利用する。"""
+        self._modified: bool = False
+        """bool: setTokens 以降にユーザーがタグを追加・削除したかどうか。"""
+
+        self.setFrameShape(QFrame.StyledPanel)
+        self.setStyleSheet(TAG_CHIP_STYLE)
+        self._flow_layout = FlowLayout(self)
+        self._flow_layout.setContentsMargins(4, 4, 4, 4)
+
+        self.input_edit = QLineEdit()
+        self.input_edit.setFrame(False)
+        self.input_edit.setMinimumWidth(120)
+        self.input_edit.textEdited.connect(self._on_text_edited)
+        self.input_edit.returnPressed.connect(self._commit_input)
+        self.input_edit.editingFinished.connect(self._commit_input)
+        self.input_edit.installEventFilter(self)
+        self._flow_layout.addWidget(self.input_edit)
+
+    def setTokens(self, tokens: list[str] | None):
+        """表示するタグのリストを設定します。変更フラグは下ろします。
+
+        Args:
+            tokens (list[str] | None): タグのリスト。空のタグと重複は取り除く。
+        """
+        self._tokens = list(dict.fromkeys(tag for tag in tokens or [] if tag))
+        self.input_edit.clear()
+        self._modified = False
+        self._sync_chips()
+
+    def tokens(self) -> list[str]:
+        """現在のタグのリストを返します。
+
+        入力欄に確定前のテキストが残っていれば、そのタグも末尾に含めます。
+
+        Returns:
+            list[str]: タグのリストのコピー。
+        """
+        pending = [tag for tag in split_tag_text(self.input_edit.text()) if tag not in self._tokens]
+        return self._tokens + pending
+
+    def clear(self):
+        """すべてのタグと入力中のテキストを消去します。変更フラグは下ろします。"""
+        self.setTokens([])
+
+    def isModified(self) -> bool:
+        """ユーザーがタグを追加・削除したかどうかを返します (QLineEdit.isModified と同様)。"""
+        return self._modified or bool(self.input_edit.text().strip(" \t,"))
+
+    def setModified(self, modified: bool):
+        """変更フラグを設定します (QLineEdit.setModified と同様)。
+
+        Args:
+            modified (bool): 設定する値。
+        """
+        self._modified = modified
+
+    def setPlaceholderText(self, text: str):
+        """入力欄のプレースホルダーテキストを設定します。"""
+        self.input_edit.setPlaceholderText(text)
+
+    def eventFilter(self, watched, event) -> bool:
+        """入力欄が空のときの Backspace で、最後のタグを削除します。"""
+        if (watched is self.input_edit and event.type() == QEvent.KeyPress
+                and event.key() == Qt.Key_Backspace and not self.input_edit.text() and self._tokens):
+            self._remove_token(len(self._tokens) - 1)
+            return True
+        return super().eventFilter(watched, event)
+
+    def _on_text_edited(self, text: str):
+        """入力欄にカンマが入力・貼り付けされたら、その手前までをタグとして確定します。"""
+        if "," not in text:
+            return
+        committed_text, _, remainder = text.rpartition(",")
+        self._add_tokens(split_tag_text(committed_text))
+        self.input_edit.setText(remainder.lstrip())
+
+    def _commit_input(self):
+        """入力欄のテキストをタグとして確定し、入力欄を空にします。"""
+        text = self.input_edit.text()
+        if not text.strip(" \t,"):
+            return
+        self.input_edit.clear()
+        self._add_tokens(split_tag_text(text))
+
+    def _add_tokens(self, new_tokens: list[str]):
+        """まだないタグだけを末尾に追加します。"""
+        added = [tag for tag in new_tokens if tag not in self._tokens]
+        if not added:
+            return
+        self._tokens.extend(added)
+        self._modified = True
+        self._sync_chips()
+        self.tokensChanged.emit(list(self._tokens))
+
+    def _remove_token(self, index: int):
+        """指定位置のタグを削除します。"""
+        if not 0 <= index < len(self._tokens):
+            return
+        del self._tokens[index]
+        self._modified = True
+        self._sync_chips()
+        self.tokensChanged.emit(list(self._tokens))
+
+    def _sync_chips(self):
+        """チップの表示をタグのリストに合わせます。足りない分だけチップを生成します。"""
+        self.setUpdatesEnabled(False)
+        try:
+            while len(self._chips) < len(self._tokens):
+                chip = QToolButton()
+                chip.setObjectName("tagChip")
+                chip.setCursor(Qt.PointingHandCursor)
+                chip.setToolTip("クリックでこのタグを削除")
+                chip.clicked.connect(lambda _checked=False, c=chip: self._remove_token(self._chips.index(c)))
+                self._flow_layout.insertWidget(len(self._chips), chip) # 入力欄より前に並べる
+                self._chips.append(chip)
+            for index, chip in enumerate(self._chips):
+                if index < len(self._tokens):
+                    chip.setText(f"{self._tokens[index]}  ×")
+                    chip.setVisible(True)
+                else:
+                    chip.setVisible(False)
+            self._flow_layout.invalidate()
+        finally:
+            self.setUpdatesEnabled(True)
+
+
+if __name__ == '__main__':
+    """TagChipEdit の基本的な表示テスト。"""
+    import sys
+    app = QApplication(sys.argv)
+    window = QWidget()
+    window_layout = QVBoxLayout(window)
+    tag_edit = TagChipEdit()
+    tag_edit.setPlaceholderText("タグを入力して Enter")
+    tag_edit.setTokens(["戦士", "ギルド職員", "魔法武器"])
+    result_label = QLabel()
+    tag_edit.tokensChanged.connect(lambda tokens: result_label.setText(f"tokens: {tokens}"))
+    window_layout.addWidget(tag_edit)
+    window_layout.addWidget(result_label)
+    window.resize(400, 150)
+    window.show()
+    sys.exit(app.exec_())